@@ -18,29 +18,40 @@ Tasks handles:
 # Import from Python Standard Library and external packages
 import pathlib
 import sys
+import numpy as np
 import pandas as pd
 
-# Ensure project root is in sys.path for local imports
-sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))
+# Directory of the current script, resolved once and reused below
+SCRIPTS_DATA_PREP_DIR: pathlib.Path = pathlib.Path(__file__).resolve().parent
+
+# Ensure project root is in sys.path for local imports (skip if already present)
+if str(SCRIPTS_DATA_PREP_DIR.parent) not in sys.path:
+    sys.path.append(str(SCRIPTS_DATA_PREP_DIR.parent))
 
 # Import local modules (e.g. utils/logger.py)
 from utils.logger import logger
-from utils.data_scrubber import DataScrubber
+from utils.csv_writer import write_csv
+from utils.dtypes import downcast_numeric
+from utils.outliers import ReservoirSample, iqr_mask, quartiles
 
 # Constants
-SCRIPTS_DATA_PREP_DIR: pathlib.Path = pathlib.Path(__file__).resolve().parent
-
-# Directory of the current script
 SCRIPTS_DIR: pathlib.Path = SCRIPTS_DATA_PREP_DIR.parent
 PROJECT_ROOT: pathlib.Path = SCRIPTS_DIR.parent.parent
 DATA_DIR: pathlib.Path = PROJECT_ROOT / "data"
 RAW_DATA_DIR: pathlib.Path = DATA_DIR / "raw"
 PREPARED_DATA_DIR: pathlib.Path = DATA_DIR / "prepared"  # place to store prepared data
 
+# Raw files at least this large are cleaned in fixed-size chunks instead of loaded whole
+STREAM_MIN_BYTES: int = 512 * 1024 * 1024
+STREAM_CHUNK_ROWS: int = 1_000_000
+# Rows sampled for streamed medians and IQR fences (exact below this many rows)
+STREAM_SAMPLE_ROWS: int = 200_000
 
 # Ensure the directories exist or create them
-RAW_DATA_DIR.mkdir(exist_ok=True)
-PREPARED_DATA_DIR.mkdir(exist_ok=True)
+if not RAW_DATA_DIR.exists():
+    RAW_DATA_DIR.mkdir(exist_ok=True)
+if not PREPARED_DATA_DIR.exists():
+    PREPARED_DATA_DIR.mkdir(exist_ok=True)
 
 #####################################
 # Define Functions - Reusable blocks of code / instructions
@@ -51,88 +62,271 @@ def read_raw_data(file_name: str) -> pd.DataFrame:
     """Read raw data from CSV."""
     file_path: pathlib.Path = RAW_DATA_DIR.joinpath(file_name)
     try:
-        logger.info(f"READING: {file_path}.")
-        return pd.read_csv(file_path)
+        logger.info("READING: {}.", file_path)
+        return pd.read_csv(file_path, engine="pyarrow")
     except FileNotFoundError:
-        logger.error(f"File not found: {file_path}")
+        logger.error("File not found: {}", file_path)
         return pd.DataFrame()  # Return an empty DataFrame if the file is not found
     except Exception as e:
-        logger.error(f"Error reading {file_path}: {e}")
+        logger.error("Error reading {}: {}", file_path, e)
         return pd.DataFrame()  # Return an empty DataFrame if any other error occurs
 
 
 def save_prepared_data(df: pd.DataFrame, file_name: str) -> None:
     """Save cleaned data to CSV."""
     logger.info(
-        f"FUNCTION START: save_prepared_data with file_name={file_name}, dataframe shape={df.shape}"
+        "FUNCTION START: save_prepared_data with file_name={}, dataframe shape={}",
+        file_name,
+        df.shape,
     )
     file_path = PREPARED_DATA_DIR.joinpath(file_name)
-    df.to_csv(file_path, index=False)
-    logger.info(f"Data saved to {file_path}")
+    write_csv(df, file_path)
+    logger.info("Data saved to {}", file_path)
+
+
+def _first_occurrence_mask(df: pd.DataFrame) -> np.ndarray:
+    """Return a row mask keeping the first occurrence of each full-row duplicate.
+
+    Only the boolean mask is built here; callers slice the frame once, instead
+    of copying it and then materializing a second deduplicated copy.
+    """
+    return ~df.duplicated(keep="first").to_numpy()
 
 
 def remove_duplicates(df: pd.DataFrame) -> pd.DataFrame:
     """Remove duplicate rows from the DataFrame."""
-    logger.info(f"FUNCTION START: remove_duplicates with dataframe shape={df.shape}")
-    df_scrubber = DataScrubber(df)
-    df_deduped = df_scrubber.remove_duplicate_records()
+    logger.info("FUNCTION START: remove_duplicates with dataframe shape={}", df.shape)
+    df_deduped = df.iloc[_first_occurrence_mask(df)]
 
-    logger.info(f"Original dataframe shape: {df.shape}")
-    logger.info(f"Deduped  dataframe shape: {df_deduped.shape}")
+    logger.info("Original dataframe shape: {}", df.shape)
+    logger.info("Deduped  dataframe shape: {}", df_deduped.shape)
     return df_deduped
 
 
-def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
-    """Handle missing values by filling or dropping."""
-    logger.info(f"FUNCTION START: handle_missing_values with dataframe shape={df.shape}")
+def _fill_map(
+    df: pd.DataFrame, rows: np.ndarray | None = None, numeric: pd.DataFrame | None = None
+) -> dict:
+    """Return per-column fill values, computed over `rows` (a boolean row mask) when given.
 
-    # Log missing values count before handling
-    missing_before = df.isna().sum().sum()
-    logger.info(f"Total missing values before handling: {missing_before}")
+    `numeric` overrides the values medians are taken from, e.g. the numeric
+    columns collected over every chunk of a streamed file.
+    """
+    fill_map = {}
 
     if "CustomerName" in df.columns:
-        df["CustomerName"].fillna("Unknown", inplace=True)
+        fill_map["CustomerName"] = "Unknown"
+
+    # Numeric columns: fill with the column median, computed in one batched call
+    # and only for the columns that actually have missing values
+    if numeric is None:
+        numeric_cols = df.select_dtypes(include=["number"]).columns
+        numeric = df[numeric_cols] if rows is None else df.loc[rows, numeric_cols]
+    na_counts = numeric.isna().sum()
+    need = na_counts.index[na_counts.to_numpy() > 0]
+    if len(need):
+        fill_map.update(numeric[need].median().to_dict())
+    return fill_map
+
+
+def _outlier_mask(
+    df: pd.DataFrame,
+    rows: np.ndarray | None = None,
+    fences: tuple[np.ndarray, np.ndarray] | None = None,
+) -> np.ndarray:
+    """Return a row mask combining the IQR fences with the customer business rules.
+
+    IQR fences are computed over `rows` (a boolean row mask) when given, and
+    the returned mask is already restricted to those rows. Precomputed
+    `fences` (q1, q3 per numeric column) are used as-is, e.g. global
+    quartiles for one chunk of a streamed file.
+    """
+    mask = np.ones(len(df), dtype=bool) if rows is None else rows.copy()
+    numeric_cols = df.select_dtypes(include=["number"]).columns
+
+    if len(numeric_cols) > 0:
+        # Batch the quartiles for every numeric column
+        vals = df[numeric_cols].to_numpy(dtype=np.float64)
+        q1, q3 = quartiles(vals[mask]) if fences is None else fences
+        mask &= iqr_mask(vals, q1, q3).all(axis=1)
+
+    # Keep existing business rule example for InStoreTripPercent if column exists
+    if "InStoreTripPercent" in df.columns:
+        mask &= (df["InStoreTripPercent"] < 1).to_numpy()
+
+    return mask
+
+
+def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
+    """Handle missing values by filling or dropping."""
+    logger.info("FUNCTION START: handle_missing_values with dataframe shape={}", df.shape)
+
+    # Log missing values count before handling (only computed if DEBUG is enabled)
+    logger.opt(lazy=True).debug(
+        "Total missing values before handling: {}", lambda: df.isna().sum().sum()
+    )
 
     if "CustomerID" in df.columns:
-        df.dropna(subset=["CustomerID"], inplace=True)
+        df = df.dropna(subset=["CustomerID"])
 
-    numeric_cols = df.select_dtypes(include=["number"]).columns
-    for col in numeric_cols:
-        if df[col].isna().sum() > 0:
-            df[col].fillna(df[col].median(), inplace=True)
+    # Apply every fill in a single pass over the frame
+    df = df.fillna(_fill_map(df))
 
-    missing_after = df.isna().sum().sum()
-    logger.info(f"Total missing values after handling: {missing_after}")
-    logger.info(f"{len(df)} records remaining after handling missing values.")
+    logger.opt(lazy=True).debug(
+        "Total missing values after handling: {}", lambda: df.isna().sum().sum()
+    )
+    logger.info("{} records remaining after handling missing values.", len(df))
     return df
 
 
 def remove_outliers(df: pd.DataFrame) -> pd.DataFrame:
     """Remove outliers based on thresholds."""
-    logger.info(f"FUNCTION START: remove_outliers with dataframe shape={df.shape}")
+    logger.info("FUNCTION START: remove_outliers with dataframe shape={}", df.shape)
     initial_count = len(df)
 
     # === TODO filled in ===
-    numeric_cols = df.select_dtypes(include=["number"]).columns
+    # Combine the IQR fences and business rules and slice the frame once
+    df = df.iloc[_outlier_mask(df)]
 
-    for col in numeric_cols:
-        Q1 = df[col].quantile(0.25)
-        Q3 = df[col].quantile(0.75)
-        IQR = Q3 - Q1
-        lower_bound = Q1 - 1.5 * IQR
-        upper_bound = Q3 + 1.5 * IQR
-        df = df[(df[col] >= lower_bound) & (df[col] <= upper_bound)]
+    removed_count = initial_count - len(df)
+    logger.info("Removed {} outlier rows", removed_count)
+    logger.info("{} records remaining after removing outliers.", len(df))
+    return df
 
-    # Keep existing business rule example for InStoreTripPercent if column exists
-    if "InStoreTripPercent" in df.columns:
-        df = df[df["InStoreTripPercent"] < 1]
 
-    removed_count = initial_count - len(df)
-    logger.info(f"Removed {removed_count} outlier rows")
-    logger.info(f"{len(df)} records remaining after removing outliers.")
+def clean(df: pd.DataFrame) -> pd.DataFrame:
+    """Remove duplicates, handle missing values, and remove outliers in one pass.
+
+    Equivalent to remove_duplicates -> handle_missing_values -> remove_outliers,
+    but the row masks from each step are combined and the frame is sliced once.
+    Medians and IQR fences are computed over the rows that survive the earlier
+    steps, as in the staged pipeline.
+    """
+    logger.info("FUNCTION START: clean with dataframe shape={}", df.shape)
+    initial_count = len(df)
+
+    keep = _first_occurrence_mask(df)
+    logger.info("Found {} duplicate rows", int((~keep).sum()))
+
+    if "CustomerID" in df.columns:
+        keep &= df["CustomerID"].notna().to_numpy()
+
+    df = df.fillna(_fill_map(df, keep))
+    df = df.iloc[_outlier_mask(df, keep)]
+
+    logger.info("Removed {} rows while cleaning", initial_count - len(df))
+    logger.info("{} records remaining after cleaning.", len(df))
     return df
 
 
+def _read_raw_chunks(file_path: pathlib.Path, casts: dict | None = None):
+    """Yield a raw CSV in STREAM_CHUNK_ROWS-row chunks with stripped column names."""
+    # round_trip parses floats exactly, matching the pyarrow engine used by read_raw_data
+    reader = pd.read_csv(file_path, chunksize=STREAM_CHUNK_ROWS, float_precision="round_trip")
+    columns = None
+    for chunk in reader:
+        # Every chunk shares the header, so strip the names once
+        if columns is None:
+            columns = chunk.columns.str.strip()
+        chunk.columns = columns
+        yield chunk if casts is None else chunk.astype(casts)
+
+
+def _first_occurrence_in_stream(
+    chunk: pd.DataFrame, seen: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return a chunk's first-occurrence mask and the updated sorted hashes of rows seen so far.
+
+    Rows are hashed to uint64 with numeric columns widened to float64, so a row
+    hashes the same whether its chunk inferred a column as int or float.
+    """
+    numeric_cols = chunk.select_dtypes(include=["number"]).columns
+    hashes = pd.util.hash_pandas_object(
+        chunk.astype(dict.fromkeys(numeric_cols, "float64")), index=False
+    ).to_numpy()
+
+    keep = np.zeros(len(chunk), dtype=bool)
+    keep[np.unique(hashes, return_index=True)[1]] = True
+    if seen.size:
+        pos = np.minimum(np.searchsorted(seen, hashes), seen.size - 1)
+        keep &= seen[pos] != hashes
+    return keep, np.union1d(seen, hashes)
+
+
+def _scan_stream(file_path: pathlib.Path) -> tuple[pd.Index, dict, pd.DataFrame]:
+    """First pass over a streamed file: settle the column dtypes and sample numeric values.
+
+    Returns the column names, the casts that give every chunk the same dtypes
+    (float wherever any chunk inferred float, object where chunks disagree on
+    numeric vs text), and a uniform sample of up to STREAM_SAMPLE_ROWS rows of
+    the numeric columns, drawn from the rows clean() would keep: first
+    occurrences with a CustomerID.
+    """
+    columns = pd.Index([])
+    candidates = None
+    kinds: dict[str, set] = {}
+    sample = ReservoirSample(STREAM_SAMPLE_ROWS)
+    seen = np.empty(0, dtype=np.uint64)
+    for chunk in _read_raw_chunks(file_path):
+        columns = chunk.columns
+        if candidates is None:
+            candidates = chunk.select_dtypes(include=["number"]).columns
+        for col, dtype in chunk.dtypes.items():
+            kinds.setdefault(col, set()).add(dtype.kind)
+        keep, seen = _first_occurrence_in_stream(chunk, seen)
+        if "CustomerID" in chunk.columns:
+            keep &= chunk["CustomerID"].notna().to_numpy()
+        # Coerce so a column that turns textual in a later chunk still samples as float
+        kept = chunk.loc[keep, candidates].apply(pd.to_numeric, errors="coerce")
+        sample.update(kept.to_numpy(dtype=np.float64))
+
+    casts = {}
+    for col, col_kinds in kinds.items():
+        if len(col_kinds) > 1 and not col_kinds <= set("iuf"):
+            casts[col] = "object"
+        elif "f" in col_kinds and len(col_kinds) > 1:
+            casts[col] = "float64"
+    numeric_cols = [col for col in candidates if kinds[col] <= set("iuf")]
+    numeric = pd.DataFrame(sample.rows, columns=candidates)[numeric_cols]
+    return columns, casts, numeric
+
+
+def stream_clean(input_path: pathlib.Path, output_path: pathlib.Path) -> int:
+    """Clean a raw customer file chunk by chunk and append each chunk to the output CSV.
+
+    Equivalent to clean() on the whole file, but peak memory is one chunk plus
+    a fixed-size sample of the numeric columns and a uint64 hash per row. A
+    first pass estimates the global medians and IQR fences from the sample;
+    a second pass re-reads the file and applies them per chunk. Estimates are
+    exact up to STREAM_SAMPLE_ROWS kept rows and approximate beyond, which
+    suits the IQR rule, itself a heuristic.
+
+    Returns:
+        int: Number of rows written.
+    """
+    logger.info("FUNCTION START: stream_clean with input_path={}", input_path)
+
+    columns, casts, numeric = _scan_stream(input_path)
+    fill_map = _fill_map(pd.DataFrame(columns=columns), numeric=numeric)
+    # Fences are taken after filling, as clean() does
+    fences = quartiles(numeric.fillna(fill_map).to_numpy())
+
+    written = 0
+    seen = np.empty(0, dtype=np.uint64)
+    for i, chunk in enumerate(_read_raw_chunks(input_path, casts)):
+        keep, seen = _first_occurrence_in_stream(chunk, seen)
+        if "CustomerID" in chunk.columns:
+            keep &= chunk["CustomerID"].notna().to_numpy()
+
+        chunk = chunk.fillna(fill_map)
+        chunk = chunk.iloc[_outlier_mask(chunk, keep, fences)]
+        write_csv(chunk, output_path, append=i > 0)
+        written += len(chunk)
+        logger.info("Chunk {}: wrote {} rows", i, len(chunk))
+
+    logger.info("{} records written after cleaning.", written)
+    return written
+
+
 #####################################
 # Define Main Function - The main entry point of the script
 #####################################
@@ -144,49 +338,56 @@ def main():
     logger.info("STARTING prepare_customers_data.py")
     logger.info("==================================")
 
-    logger.info(f"Root         : {PROJECT_ROOT}")
-    logger.info(f"data/raw     : {RAW_DATA_DIR}")
-    logger.info(f"data/prepared: {PREPARED_DATA_DIR}")
+    logger.info("Root         : {}", PROJECT_ROOT)
+    logger.info("data/raw     : {}", RAW_DATA_DIR)
+    logger.info("data/prepared: {}", PREPARED_DATA_DIR)
 
     input_file = "customers_data.csv"
     output_file = "customers_prepared.csv"
 
+    # Very large files are cleaned in chunks so they never have to fit in memory
+    input_path = RAW_DATA_DIR.joinpath(input_file)
+    if input_path.exists() and input_path.stat().st_size >= STREAM_MIN_BYTES:
+        stream_clean(input_path, PREPARED_DATA_DIR.joinpath(output_file))
+        logger.info("FINISHED prepare_customers_data.py")
+        return
+
     # Read raw data
     df = read_raw_data(input_file)
 
+    # Narrow numeric dtypes so every later pass moves fewer bytes
+    df = downcast_numeric(df)
+
     # Record original shape
     original_shape = df.shape
 
     # Log initial dataframe information
-    logger.info(f"Initial dataframe columns: {', '.join(df.columns.tolist())}")
-    logger.info(f"Initial dataframe shape: {df.shape}")
-
-    # Clean column names
-    original_columns = df.columns.tolist()
-    df.columns = df.columns.str.strip()
-
-    # Log if any column names changed
-    changed_columns = [
-        f"{old} -> {new}" for old, new in zip(original_columns, df.columns) if old != new
-    ]
-    if changed_columns:
-        logger.info(f"Cleaned column names: {', '.join(changed_columns)}")
-
-    # Remove duplicates
-    df = remove_duplicates(df)
-
-    # Handle missing values
-    df = handle_missing_values(df)
-
-    # Remove outliers
-    df = remove_outliers(df)
+    logger.info("Initial dataframe columns: {}", ", ".join(df.columns.tolist()))
+    logger.info("Initial dataframe shape: {}", df.shape)
+
+    # Clean column names, reassigning the index only if a name actually changes
+    original_columns = df.columns
+    cleaned_columns = original_columns.str.strip()
+    if not cleaned_columns.equals(original_columns):
+        df.columns = cleaned_columns
+
+        # Log which column names changed
+        changed_columns = [
+            f"{old} -> {new}"
+            for old, new in zip(original_columns, cleaned_columns, strict=True)
+            if old != new
+        ]
+        logger.info("Cleaned column names: {}", ", ".join(changed_columns))
+
+    # Remove duplicates, handle missing values and remove outliers in a single pass
+    df = clean(df)
 
     # Save prepared data
     save_prepared_data(df, output_file)
 
     logger.info("==================================")
-    logger.info(f"Original shape: {df.shape}")
-    logger.info(f"Cleaned shape:  {original_shape}")
+    logger.info("Original shape: {}", df.shape)
+    logger.info("Cleaned shape:  {}", original_shape)
     logger.info("==================================")
     logger.info("FINISHED prepare_customers_data.py")
     logger.info("==================================")
@@ -18,19 +18,25 @@ Tasks:
 # Import from Python Standard Library
 import pathlib
 import sys
+import numpy as np
 import pandas as pd
 
-# Ensure project root is in sys.path for local imports
-sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+# Directory of the current script, resolved once and reused below
+SCRIPTS_DATA_PREP_DIR: pathlib.Path = pathlib.Path(__file__).resolve().parent
+
+# Ensure project root is in sys.path for local imports (skip if already present)
+if str(SCRIPTS_DATA_PREP_DIR.parent) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DATA_PREP_DIR.parent))
 
 # Import local modules (e.g. utils/logger.py)
 from utils.logger import logger
 from utils.data_scrubber import DataScrubber
+from utils.csv_writer import write_csv
+from utils.dtypes import downcast_numeric
+from utils.outliers import iqr_mask, quartiles
+from utils.text import normalize_text, transform_distinct
 
 # Constants
-SCRIPTS_DATA_PREP_DIR: pathlib.Path = pathlib.Path(__file__).resolve().parent
-
-# Directory of the current script
 SCRIPTS_DIR: pathlib.Path = SCRIPTS_DATA_PREP_DIR.parent
 PROJECT_ROOT: pathlib.Path = SCRIPTS_DIR.parent.parent
 DATA_DIR: pathlib.Path = PROJECT_ROOT / "data"
@@ -39,8 +45,10 @@ PREPARED_DATA_DIR: pathlib.Path = DATA_DIR / "prepared"  # place to store prepar
 
 
 # Ensure the directories exist or create them
-RAW_DATA_DIR.mkdir(exist_ok=True)
-PREPARED_DATA_DIR.mkdir(exist_ok=True)
+if not RAW_DATA_DIR.exists():
+    RAW_DATA_DIR.mkdir(exist_ok=True)
+if not PREPARED_DATA_DIR.exists():
+    PREPARED_DATA_DIR.mkdir(exist_ok=True)
 
 #####################################
 # Define Functions - Reusable blocks of code / instructions
@@ -49,15 +57,15 @@ PREPARED_DATA_DIR.mkdir(exist_ok=True)
 
 def read_raw_data(file_name: str) -> pd.DataFrame:
     """Read raw data from CSV."""
-    logger.info(f"FUNCTION START: read_raw_data with file_name={file_name}")
+    logger.info("FUNCTION START: read_raw_data with file_name={}", file_name)
     file_path = RAW_DATA_DIR.joinpath(file_name)
-    logger.info(f"Reading data from {file_path}")
-    df = pd.read_csv(file_path)
-    logger.info(f"Loaded dataframe with {len(df)} rows and {len(df.columns)} columns")
+    logger.info("Reading data from {}", file_path)
+    df = pd.read_csv(file_path, engine="pyarrow")
+    logger.info("Loaded dataframe with {} rows and {} columns", len(df), len(df.columns))
 
-    # Add data profiling to understand the dataset
-    logger.info(f"Column datatypes:\n{df.dtypes}")
-    logger.info(f"Number of unique values:\n{df.nunique()}")
+    # Add data profiling to understand the dataset (only computed if DEBUG is enabled)
+    logger.opt(lazy=True).debug("Column datatypes:\n{}", lambda: df.dtypes)
+    logger.opt(lazy=True).debug("Number of unique values:\n{}", lambda: df.nunique())
 
     return df
 
@@ -70,11 +78,120 @@ def save_prepared_data(df: pd.DataFrame, file_name: str) -> None:
         file_name (str): Name of the output file.
     """
     logger.info(
-        f"FUNCTION START: save_prepared_data with file_name={file_name}, dataframe shape={df.shape}"
+        "FUNCTION START: save_prepared_data with file_name={}, dataframe shape={}",
+        file_name,
+        df.shape,
     )
     file_path = PREPARED_DATA_DIR.joinpath(file_name)
-    df.to_csv(file_path, index=False)
-    logger.info(f"Data saved to {file_path}")
+    write_csv(df, file_path)
+    logger.info("Data saved to {}", file_path)
+
+
+def _first_occurrence_mask(df: pd.DataFrame) -> np.ndarray:
+    """Return a row mask keeping the first occurrence of each product.
+
+    Hashes only productid when present, otherwise whole rows.
+    """
+    if "productid" in df.columns:
+        keys = df["productid"]
+        if pd.api.types.is_integer_dtype(keys):
+            keys = keys.astype("int64", copy=False)
+        return ~keys.duplicated(keep="first").to_numpy()
+    return ~df.duplicated().to_numpy()
+
+
+def _fill_map(df: pd.DataFrame, rows: np.ndarray | None = None) -> dict:
+    """Return per-column fill values, computed over `rows` (a boolean row mask) when given."""
+    fill_map = {}
+
+    # Product name: fill with placeholder
+    if "productname" in df.columns:
+        fill_map["productname"] = "Unknown Product"
+
+    # Price: replace missing with median
+    if "unitprice" in df.columns:
+        if pd.api.types.is_numeric_dtype(df["unitprice"]):
+            prices = df["unitprice"] if rows is None else df.loc[rows, "unitprice"]
+            fill_map["unitprice"] = prices.median()
+
+    # Category: fill with mode
+    if "category" in df.columns:
+        categories = df["category"] if rows is None else df.loc[rows, "category"]
+        if categories.dropna().size > 0:
+            fill_map["category"] = categories.mode()[0]
+
+    return fill_map
+
+
+def _required_mask(df: pd.DataFrame) -> np.ndarray:
+    """Return a row mask that is False where a mandatory field (product ID or code) is missing."""
+    mask = np.ones(len(df), dtype=bool)
+    for critical in ["productid", "product_code"]:
+        if critical in df.columns:
+            present = df[critical].notna().to_numpy()
+            dropped = int((mask & ~present).sum())
+            if dropped:
+                logger.info("Dropped {} rows missing mandatory field: {}", dropped, critical)
+            mask &= present
+    return mask
+
+
+def _outlier_mask(df: pd.DataFrame, rows: np.ndarray | None = None) -> np.ndarray:
+    """Return a row mask combining the IQR fences with the product sanity rules.
+
+    IQR fences are computed over `rows` (a boolean row mask) when given, and
+    the returned mask is already restricted to those rows.
+    """
+    mask = np.ones(len(df), dtype=bool) if rows is None else rows.copy()
+
+    # Use IQR-based outlier removal for numeric product fields
+    numeric_candidates = [
+        col
+        for col in ["unitprice", "stockcount"]
+        if col in df.columns and pd.api.types.is_numeric_dtype(df[col])
+    ]
+    if numeric_candidates:
+        # Compute the fences for all candidates at once
+        vals = df[numeric_candidates].to_numpy(dtype=np.float64)
+        q1, q3 = quartiles(vals[mask])
+        iqr = q3 - q1
+        active = ~(np.isnan(iqr) | (iqr == 0))
+        in_bounds = iqr_mask(vals, q1, q3)
+        for j, col in enumerate(numeric_candidates):
+            if not active[j]:
+                logger.debug("Skipping IQR outlier removal for {}: IQR={}", col, iqr[j])
+                continue
+            lower_bound = q1[j] - 1.5 * iqr[j]
+            upper_bound = q3[j] + 1.5 * iqr[j]
+            logger.info(
+                "Applied IQR outlier removal to {}: bounds [{}, {}] - flagged {} rows",
+                col,
+                lower_bound,
+                upper_bound,
+                int((mask & ~in_bounds[:, j]).sum()),
+            )
+        mask &= in_bounds[:, active].all(axis=1)
+
+    # ProductID must be positive
+    if "productid" in df.columns:
+        valid_ids = df["productid"].gt(0).to_numpy()
+        if not valid_ids[mask].all():
+            logger.info(
+                "Removing {} rows with non-positive productid", int((mask & ~valid_ids).sum())
+            )
+        mask &= valid_ids
+
+    # Additional simple sanity rules (no negative prices/stock)
+    for col in ["unitprice", "stockcount"]:
+        if col in df.columns and pd.api.types.is_numeric_dtype(df[col]):
+            non_negative = df[col].ge(0).to_numpy()
+            if not non_negative[mask].all():
+                logger.info(
+                    "Removing {} rows with negative {}", int((mask & ~non_negative).sum()), col
+                )
+            mask &= non_negative
+
+    return mask
 
 
 def remove_duplicates(df: pd.DataFrame) -> pd.DataFrame:
@@ -86,117 +203,93 @@ def remove_duplicates(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pd.DataFrame: DataFrame with duplicates removed.
     """
-    logger.info(f"FUNCTION START: remove_duplicates with dataframe shape={df.shape}")
+    logger.info("FUNCTION START: remove_duplicates with dataframe shape={}", df.shape)
     initial_count = len(df)
 
     # For products, ProductID is the unique identifier
     # Remove duplicates based on ProductID (keep first occurrence)
     if "productid" in df.columns:
         logger.info("Removing duplicates based on productid column")
-        df = df.drop_duplicates(subset=["productid"], keep="first")
-        logger.info("Duplicates removed based on ProductID")
     else:
         # Fallback: remove all duplicate rows
         logger.warning("productid column not found, removing complete duplicate rows instead")
-        df = df.drop_duplicates()
+    df = df.iloc[_first_occurrence_mask(df)]
 
     removed_count = initial_count - len(df)
-    logger.info(f"Removed {removed_count} duplicate rows")
-    logger.info(f"{len(df)} records remaining after removing duplicates.")
+    logger.info("Removed {} duplicate rows", removed_count)
+    logger.info("{} records remaining after removing duplicates.", len(df))
     return df
 
 
 def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
     """Handle missing values by filling or dropping."""
 
-    logger.info(f"FUNCTION START: handle_missing_values with dataframe shape={df.shape}")
-
-    # Log missing values before handling
-    missing_by_col = df.isna().sum()
-    logger.info(f"Missing values by column before handling:\n{missing_by_col}")
-
-    # Product name: fill with placeholder
-    if "productname" in df.columns:
-        df["productname"].fillna("Unknown Product", inplace=True)
+    logger.info("FUNCTION START: handle_missing_values with dataframe shape={}", df.shape)
 
-    # Price: replace missing with median
-    if "unitprice" in df.columns:
-        if pd.api.types.is_numeric_dtype(df["unitprice"]):
-            median_price = df["unitprice"].median()
-            df["unitprice"].fillna(median_price, inplace=True)
+    # Log missing values before handling (only computed if DEBUG is enabled)
+    logger.opt(lazy=True).debug(
+        "Missing values by column before handling:\n{}", lambda: df.isna().sum()
+    )
 
-    # Category: fill with mode
-    if "category" in df.columns:
-        if df["category"].dropna().size > 0:
-            mode_cat = df["category"].mode()[0]
-            df["category"].fillna(mode_cat, inplace=True)
+    # Apply every fill in a single pass over the frame
+    df = df.fillna(_fill_map(df))
 
     # Product code or ID missing → drop row (critical field)
-    for critical in ["productid", "product_code"]:
-        if critical in df.columns:
-            before = len(df)
-            df = df.dropna(subset=[critical])
-            dropped = before - len(df)
-            if dropped:
-                logger.info(f"Dropped {dropped} rows missing mandatory field: {critical}")
+    df = df.iloc[_required_mask(df)]
 
     # Log missing values after handling
-    missing_after = df.isna().sum()
-    logger.info(f"Missing values by column after handling:\n{missing_after}")
-    logger.info(f"{len(df)} records remaining after handling missing values.")
-
+    logger.opt(lazy=True).debug(
+        "Missing values by column after handling:\n{}", lambda: df.isna().sum()
+    )
+    logger.info("{} records remaining after handling missing values.", len(df))
     return df
 
 
 def remove_outliers(df: pd.DataFrame) -> pd.DataFrame:
-    """Remove outliers based on thresholds.
+    """Remove outliers and rows that break business rules.
 
-    This logic is very specific to the actual data and business rules.
+    IQR fences and the sanity rules (positive productid, non-negative
+    unitprice and stockcount) are combined into one row mask and the frame
+    is sliced once. This logic is very specific to the actual data and
+    business rules.
 
     Args:
         df (pd.DataFrame): Input DataFrame.
 
     Returns:
-        pd.DataFrame: DataFrame with outliers removed.
+        pd.DataFrame: DataFrame with outliers and invalid rows removed.
     """
-    logger.info(f"FUNCTION START: remove_outliers with dataframe shape={df.shape}")
+    logger.info("FUNCTION START: remove_outliers with dataframe shape={}", df.shape)
     initial_count = len(df)
 
-    # Use IQR-based outlier removal for numeric product fields
-    numeric_candidates = ["unitprice", "stockcount"]
-    for col in numeric_candidates:
-        if col in df.columns and pd.api.types.is_numeric_dtype(df[col]):
-            q1 = df[col].quantile(0.25)
-            q3 = df[col].quantile(0.75)
-            iqr = q3 - q1
-            if pd.isna(iqr) or iqr == 0:
-                logger.debug(f"Skipping IQR outlier removal for {col}: IQR={iqr}")
-                continue
-            lower_bound = q1 - 1.5 * iqr
-            upper_bound = q3 + 1.5 * iqr
-            before = len(df)
-            df = df[(df[col] >= lower_bound) & (df[col] <= upper_bound)]
-            after = len(df)
-            logger.info(
-                f"Applied IQR outlier removal to {col}: bounds [{lower_bound}, {upper_bound}] - removed {before - after} rows"
-            )
+    df = df.iloc[_outlier_mask(df)]
 
-    # Additional simple sanity rules (no negative prices/stock)
-    if "unitprice" in df.columns and pd.api.types.is_numeric_dtype(df["unitprice"]):
-        neg_prices = df[df["unitprice"] < 0].shape[0]
-        if neg_prices > 0:
-            logger.info(f"Removing {neg_prices} rows with negative unitprice")
-            df = df[df["unitprice"] >= 0]
+    removed_count = initial_count - len(df)
+    logger.info("Removed {} outlier rows", removed_count)
+    logger.info("{} records remaining after removing outliers.", len(df))
+    return df
 
-    if "stockcount" in df.columns and pd.api.types.is_numeric_dtype(df["stockcount"]):
-        neg_stock = df[df["stockcount"] < 0].shape[0]
-        if neg_stock > 0:
-            logger.info(f"Removing {neg_stock} rows with negative stockcount")
-            df = df[df["stockcount"] >= 0]
 
-    removed_count = initial_count - len(df)
-    logger.info(f"Removed {removed_count} outlier rows")
-    logger.info(f"{len(df)} records remaining after removing outliers.")
+def clean(df: pd.DataFrame) -> pd.DataFrame:
+    """Remove duplicates, handle missing values, and remove outliers in one pass.
+
+    Equivalent to remove_duplicates -> handle_missing_values -> remove_outliers,
+    but the row masks from each step are combined and the frame is sliced once.
+    Fill values and IQR fences are computed over the rows that survive the
+    earlier steps, as in the staged pipeline.
+    """
+    logger.info("FUNCTION START: clean with dataframe shape={}", df.shape)
+    initial_count = len(df)
+
+    keep = _first_occurrence_mask(df)
+    logger.info("Found {} duplicate rows", int((~keep).sum()))
+
+    df = df.fillna(_fill_map(df, keep))
+    keep &= _required_mask(df)
+    df = df.iloc[_outlier_mask(df, keep)]
+
+    logger.info("Removed {} rows while cleaning", initial_count - len(df))
+    logger.info("{} records remaining after cleaning.", len(df))
     return df
 
 
@@ -209,18 +302,19 @@ def standardize_formats(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pd.DataFrame: DataFrame with standardized formatting.
     """
-    logger.info(f"FUNCTION START: standardize_formats with dataframe shape={df.shape}")
+    logger.info("FUNCTION START: standardize_formats with dataframe shape={}", df.shape)
 
     # Standardize textual fields
     if "productname" in df.columns:
-        # Strip whitespace and title-case common product names
-        df["productname"] = df["productname"].astype(str).str.strip().str.title()
+        # Strip whitespace and title-case product names with Arrow string kernels
+        df["productname"] = normalize_text(df["productname"])
 
+    # Low-cardinality fields: transform each distinct value once
     if "category" in df.columns:
-        df["category"] = df["category"].astype(str).str.strip().str.lower()
+        df["category"] = transform_distinct(df["category"], lambda s: s.str.strip().str.lower())
 
     if "supplier" in df.columns:
-        df["supplier"] = df["supplier"].astype(str).str.strip()
+        df["supplier"] = transform_distinct(df["supplier"], lambda s: s.str.strip())
 
     # Round currency/float fields
     if "unitprice" in df.columns and pd.api.types.is_numeric_dtype(df["unitprice"]):
@@ -234,52 +328,16 @@ def standardize_formats(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def validate_data(df: pd.DataFrame) -> pd.DataFrame:
-    """Validate data against business rules.
-
-    Args:
-        df (pd.DataFrame): Input DataFrame.
-
-    Returns:
-        pd.DataFrame: Validated DataFrame.
-    """
-    logger.info(f"FUNCTION START: validate_data with dataframe shape={df.shape}")
-
-    # ProductID must be positive
-    if "productid" in df.columns:
-        invalid_ids = df[df["productid"] <= 0].shape[0]
-        if invalid_ids > 0:
-            logger.info(f"Dropping {invalid_ids} rows with non-positive productid")
-            df = df[df["productid"] > 0]
-
-    # UnitPrice must be non-negative
-    if "unitprice" in df.columns and pd.api.types.is_numeric_dtype(df["unitprice"]):
-        neg_prices = df[df["unitprice"] < 0].shape[0]
-        if neg_prices > 0:
-            logger.info(f"Dropping {neg_prices} rows with negative unitprice")
-            df = df[df["unitprice"] >= 0]
-
-    # StockCount should be integer >= 0
-    if "stockcount" in df.columns and pd.api.types.is_numeric_dtype(df["stockcount"]):
-        neg_stock = df[df["stockcount"] < 0].shape[0]
-        if neg_stock > 0:
-            logger.info(f"Dropping {neg_stock} rows with negative stockcount")
-            df = df[df["stockcount"] >= 0]
-
-    logger.info("Data validation complete")
-    return df
-
-
 def main() -> None:
     """Process product data for analytics."""
     logger.info("==================================")
     logger.info("STARTING prepare_products_data.py")
     logger.info("==================================")
 
-    logger.info(f"Root         : {PROJECT_ROOT}")
-    logger.info(f"data/raw     : {RAW_DATA_DIR}")
-    logger.info(f"data/prepared: {PREPARED_DATA_DIR}")
-    logger.info(f"scripts      : {SCRIPTS_DIR}")
+    logger.info("Root         : {}", PROJECT_ROOT)
+    logger.info("data/raw     : {}", RAW_DATA_DIR)
+    logger.info("data/prepared: {}", PREPARED_DATA_DIR)
+    logger.info("scripts      : {}", SCRIPTS_DIR)
 
     input_file = "products_data.csv"
     output_file = "products_prepared.csv"
@@ -287,40 +345,33 @@ def main() -> None:
     # Read raw data
     df = read_raw_data(input_file)
 
-    # Read raw data
-    df = read_raw_data(input_file)
+    # Narrow numeric dtypes so every later pass moves fewer bytes
+    df = downcast_numeric(df)
 
     # Record original shape
     original_shape = df.shape
 
     # Log initial dataframe information
-    logger.info(f"Initial dataframe columns: {', '.join(df.columns.tolist())}")
-    logger.info(f"Initial dataframe shape: {df.shape}")
-
-    # Clean column names
-    original_columns = df.columns.tolist()
-    df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
-
-    # Log if any column names changed
-    changed_columns = [
-        f"{old} -> {new}"
-        for old, new in zip(original_columns, df.columns, strict=True)
-        if old != new
-    ]
-    if changed_columns:
-        logger.info(f"Cleaned column names: {', '.join(changed_columns)}")
-
-    # Remove duplicates
-    df = remove_duplicates(df)
-
-    # Handle missing values
-    df = handle_missing_values(df)
-
-    # TODO:Remove outliers
-    df = remove_outliers(df)
-
-    # TODO: Validate data
-    df = validate_data(df)
+    logger.info("Initial dataframe columns: {}", ", ".join(df.columns.tolist()))
+    logger.info("Initial dataframe shape: {}", df.shape)
+
+    # Clean column names, reassigning the index only if a name actually changes
+    original_columns = df.columns
+    cleaned_columns = original_columns.str.strip().str.lower().str.replace(" ", "_", regex=False)
+    if not cleaned_columns.equals(original_columns):
+        df.columns = cleaned_columns
+
+        # Log which column names changed
+        changed_columns = [
+            f"{old} -> {new}"
+            for old, new in zip(original_columns, cleaned_columns, strict=True)
+            if old != new
+        ]
+        logger.info("Cleaned column names: {}", ", ".join(changed_columns))
+
+    # Remove duplicates, handle missing values, remove outliers and validate
+    # business rules in a single pass
+    df = clean(df)
 
     # TODO: Standardize formats
     df = standardize_formats(df)
@@ -329,8 +380,8 @@ def main() -> None:
     save_prepared_data(df, output_file)
 
     logger.info("==================================")
-    logger.info(f"Original shape: {df.shape}")
-    logger.info(f"Cleaned shape:  {original_shape}")
+    logger.info("Original shape: {}", df.shape)
+    logger.info("Cleaned shape:  {}", original_shape)
     logger.info("==================================")
     logger.info("FINISHED prepare_products_data.py")
     logger.info("==================================")
@@ -16,37 +16,66 @@ Tasks:
 #####################################
 
 # Import from Python Standard Library
+from datetime import datetime
 import pathlib
 import sys
+import numpy as np
 import pandas as pd
 
-# Ensure project root is in sys.path for local imports
-sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+# Directory of the current script, resolved once and reused below
+SCRIPTS_DATA_PREP_DIR: pathlib.Path = pathlib.Path(__file__).resolve().parent
+
+# Ensure project root is in sys.path for local imports (skip if already present)
+if str(SCRIPTS_DATA_PREP_DIR.parent) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DATA_PREP_DIR.parent))
 
 # Import local modules (e.g. utils/logger.py)
 from utils.logger import logger
 from utils.data_scrubber import DataScrubber
+from utils.csv_writer import write_csv
+from utils.dtypes import downcast_numeric
+from utils.text import transform_distinct
 
 # Constants
-SCRIPTS_DATA_PREP_DIR: pathlib.Path = pathlib.Path(__file__).resolve().parent
-
-# Directory of the current script
 SCRIPTS_DIR: pathlib.Path = SCRIPTS_DATA_PREP_DIR.parent
 PROJECT_ROOT: pathlib.Path = SCRIPTS_DIR.parent.parent
 DATA_DIR: pathlib.Path = PROJECT_ROOT / "data"
 RAW_DATA_DIR: pathlib.Path = DATA_DIR / "raw"
 PREPARED_DATA_DIR: pathlib.Path = DATA_DIR / "prepared"  # place to store prepared data
 
+# SaleDate formats tried against the first value, and the format written to CSV
+SALE_DATE_FORMATS: list[str] = ["%m/%d/%Y", "%Y-%m-%d", "%m-%d-%Y", "%Y/%m/%d"]
+SALE_DATE_OUTPUT_FORMAT: str = "%m/%d/%Y"
 
 # Ensure the directories exist or create them
-RAW_DATA_DIR.mkdir(exist_ok=True)
-PREPARED_DATA_DIR.mkdir(exist_ok=True)
+if not RAW_DATA_DIR.exists():
+    RAW_DATA_DIR.mkdir(exist_ok=True)
+if not PREPARED_DATA_DIR.exists():
+    PREPARED_DATA_DIR.mkdir(exist_ok=True)
 
 #####################################
 # Define Functions - Reusable blocks of code / instructions
 #####################################
 
 
+def detect_date_format(values: pd.Series) -> str | None:
+    """Return the first SALE_DATE_FORMATS entry that parses the first non-null value.
+
+    Returns None when no candidate matches, letting pandas infer the format.
+    """
+    first_valid = values.first_valid_index()
+    if first_valid is None:
+        return None
+    sample = str(values.loc[first_valid]).strip()
+    for fmt in SALE_DATE_FORMATS:
+        try:
+            datetime.strptime(sample, fmt)
+        except ValueError:
+            continue
+        return fmt
+    return None
+
+
 def read_raw_data(file_name: str) -> pd.DataFrame:
     """Read raw data from CSV.
 
@@ -56,76 +85,111 @@ def read_raw_data(file_name: str) -> pd.DataFrame:
     Returns:
         pd.DataFrame: Loaded DataFrame.
     """
-    logger.info(f"FUNCTION START: read_raw_data with file_name={file_name}")
+    logger.info("FUNCTION START: read_raw_data with file_name={}", file_name)
     file_path = RAW_DATA_DIR.joinpath(file_name)
-    logger.info(f"Reading data from {file_path}")
-    df = pd.read_csv(file_path)
-    logger.info(f"Loaded dataframe with {len(df)} rows and {len(df.columns)} columns")
+    logger.info("Reading data from {}", file_path)
+    df = pd.read_csv(file_path, engine="pyarrow")
+    logger.info("Loaded dataframe with {} rows and {} columns", len(df), len(df.columns))
 
     return df
 
 
-def remove_duplicates(df: pd.DataFrame) -> pd.DataFrame:
-    """Remove duplicate sales records.
+def _first_occurrence_mask(df: pd.DataFrame) -> np.ndarray:
+    """Return a row mask keeping the first occurrence of each sale.
 
-    Uses TransactionID as the unique identifier when present, otherwise
-    falls back to removing full-row duplicates.
+    Hashes only TransactionID when present, otherwise whole rows.
     """
-    logger.info(f"FUNCTION START: remove_duplicates with dataframe shape={df.shape}")
-    initial = len(df)
     if "TransactionID" in df.columns:
-        df = df.drop_duplicates(subset=["TransactionID"], keep="first")
-        logger.info("Removed duplicates based on TransactionID")
-    else:
-        df = df.drop_duplicates()
-        logger.info("Removed full-row duplicates (TransactionID not found)")
+        keys = df["TransactionID"]
+        if pd.api.types.is_integer_dtype(keys):
+            keys = keys.astype("int64", copy=False)
+        return ~keys.duplicated(keep="first").to_numpy()
+    return ~df.duplicated().to_numpy()
 
-    logger.info(f"Removed {initial - len(df)} duplicate rows")
-    logger.info(f"{len(df)} records remaining after removing duplicates.")
-    return df
 
+def _fill_map(df: pd.DataFrame, rows: np.ndarray | None = None) -> dict:
+    """Return per-column fill values: the mean for numeric columns, the mode otherwise.
 
-def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
-    """Handle missing values and outliers in the DataFrame."""
-    initial = len(df)  # Track initial row count
+    Statistics are computed over `rows` (a boolean row mask) when given.
+    """
+    fill_map = {}
 
-    # Numeric columns
+    # Numeric columns: fill with the column mean
     numeric_cols = df.select_dtypes(include=["number"]).columns
-    for col in numeric_cols:
-        mean_value = df[col].mean()
-        df[col] = df[col].fillna(mean_value)
-        logger.info(f"Filled missing values in '{col}' with mean {mean_value:.2f}")
+    numeric = df[numeric_cols] if rows is None else df.loc[rows, numeric_cols]
+    for col, mean_value in numeric.mean().items():
+        fill_map[col] = mean_value
+        logger.info("Filled missing values in '{}' with mean {:.2f}", col, mean_value)
+
+    # Categorical columns: fill with the column mode
+    categorical_cols = df.select_dtypes(include=["object"]).columns
+    for col in categorical_cols:
+        modes = (df[col] if rows is None else df.loc[rows, col]).mode()
+        mode_value = modes[0] if not modes.empty else "Unknown"
+        fill_map[col] = mode_value
+        logger.info("Filled missing values in '{}' with mode '{}'", col, mode_value)
+
+    return fill_map
+
+
+def _apply_fills(df: pd.DataFrame, fill_map: dict) -> pd.DataFrame:
+    """Apply every fill in a single pass and restore integer CampaignID."""
+    df = df.fillna(fill_map)
 
     # Convert CampaignID to integer (remove decimal places)
     if "CampaignID" in df.columns:
         df["CampaignID"] = df["CampaignID"].astype(int)
         logger.info("Converted CampaignID to integer format")
+    return df
 
-    # Categorical columns
-    categorical_cols = df.select_dtypes(include=["object"]).columns
-    for col in categorical_cols:
-        if not df[col].mode().empty:
-            mode_value = df[col].mode()[0]
-        else:
-            mode_value = "Unknown"
-        df[col] = df[col].fillna(mode_value)
-        logger.info(f"Filled missing values in '{col}' with mode '{mode_value}'")
+
+def _outlier_mask(df: pd.DataFrame) -> np.ndarray:
+    """Return a row mask rejecting negative SaleAmount and DiscountPercent outside 0..100."""
+    mask = np.ones(len(df), dtype=bool)
 
     # Remove negative SaleAmount
     if "SaleAmount" in df.columns and pd.api.types.is_numeric_dtype(df["SaleAmount"]):
-        neg = (df["SaleAmount"] < 0).sum()
-        if neg > 0:
-            df = df[df["SaleAmount"] >= 0]
-            logger.info(f"Removed {neg} rows with negative SaleAmount")
+        non_negative = df["SaleAmount"].ge(0).to_numpy()
+        if not non_negative.all():
+            logger.info("Removing {} rows with negative SaleAmount", int((~non_negative).sum()))
+        mask &= non_negative
 
     # DiscountPercent bounds 0..100
     if "DiscountPercent" in df.columns and pd.api.types.is_numeric_dtype(df["DiscountPercent"]):
-        before = len(df)
-        df = df[(df["DiscountPercent"] >= 0) & (df["DiscountPercent"] <= 100)]
-        logger.info(f"Applied bounds to DiscountPercent, removed {before - len(df)} rows")
+        in_range = df["DiscountPercent"].between(0, 100).to_numpy()
+        logger.info("Applied bounds to DiscountPercent removed {} rows", int((~in_range).sum()))
+        mask &= in_range
+
+    return mask
+
+
+def remove_duplicates(df: pd.DataFrame) -> pd.DataFrame:
+    """Remove duplicate sales records.
+
+    Uses TransactionID as the unique identifier when present, otherwise
+    falls back to removing full-row duplicates.
+    """
+    logger.info("FUNCTION START: remove_duplicates with dataframe shape={}", df.shape)
+    initial = len(df)
+    df = df.iloc[_first_occurrence_mask(df)]
+    if "TransactionID" in df.columns:
+        logger.info("Removed duplicates based on TransactionID")
+    else:
+        logger.info("Removed full-row duplicates (TransactionID not found)")
+
+    logger.info("Removed {} duplicate rows", initial - len(df))
+    logger.info("{} records remaining after removing duplicates.", len(df))
+    return df
+
 
-    logger.info(f"Removed {initial - len(df)} outlier rows")
-    logger.info(f"{len(df)} records remaining after cleaning.")
+def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
+    """Handle missing values in the DataFrame.
+
+    Row-level filters (negative SaleAmount, DiscountPercent bounds) are applied
+    once in remove_outliers rather than repeated here.
+    """
+    df = _apply_fills(df, _fill_map(df))
+    logger.info("{} records remaining after handling missing values.", len(df))
     return df
 
 
@@ -142,35 +206,47 @@ def remove_outliers(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pd.DataFrame: DataFrame with outliers removed
     """
-    logger.info(f"FUNCTION START: remove_outliers with dataframe shape={df.shape}")
+    logger.info("FUNCTION START: remove_outliers with dataframe shape={}", df.shape)
     initial = len(df)
 
-    # Remove negative SaleAmount
-    if "SaleAmount" in df.columns and pd.api.types.is_numeric_dtype(df["SaleAmount"]):
-        neg = df[df["SaleAmount"] < 0].shape[0]
-        if neg > 0:
-            df = df[df["SaleAmount"] >= 0]
-            logger.info(f"Removed {neg} rows with negative SaleAmount")
+    # Combine the rules and slice the frame once
+    df = df.iloc[_outlier_mask(df)]
 
-    # DiscountPercent bounds 0..100
-    if "DiscountPercent" in df.columns and pd.api.types.is_numeric_dtype(df["DiscountPercent"]):
-        before = len(df)
-        df = df[(df["DiscountPercent"] >= 0) & (df["DiscountPercent"] <= 100)]
-        logger.info(f"Applied bounds to DiscountPercent removed {before - len(df)} rows")
+    logger.info("Removed {} outlier rows", initial - len(df))
+    logger.info("{} records remaining after removing outliers.", len(df))
+    return df
+
+
+def clean(df: pd.DataFrame) -> pd.DataFrame:
+    """Remove duplicates, fill missing values, and remove outliers in one pass.
 
-    logger.info(f"Removed {initial - len(df)} outlier rows")
-    logger.info(f"{len(df)} records remaining after removing outliers.")
+    Equivalent to remove_duplicates -> handle_missing_values -> remove_outliers,
+    but the row masks from each step are combined and the frame is sliced once.
+    Fill values are computed over the rows that survive deduplication, as in
+    the staged pipeline.
+    """
+    logger.info("FUNCTION START: clean with dataframe shape={}", df.shape)
+    initial = len(df)
+
+    keep = _first_occurrence_mask(df)
+    logger.info("Found {} duplicate rows", int((~keep).sum()))
+
+    df = _apply_fills(df, _fill_map(df, keep))
+    df = df.iloc[keep & _outlier_mask(df)]
+
+    logger.info("Removed {} rows while cleaning", initial - len(df))
+    logger.info("{} records remaining after cleaning.", len(df))
     return df
 
 
 def standardize_formats(df: pd.DataFrame) -> pd.DataFrame:
     """Standardize formats for sale records.
 
-    - Parse SaleDate to ISO (YYYY-MM-DD) where possible
+    - Parse SaleDate to datetime64 (written out as mm/dd/yyyy)
     - Strip string fields
     - Drop empty unnamed columns
     """
-    logger.info(f"FUNCTION START: standardize_formats with dataframe shape={df.shape}")
+    logger.info("FUNCTION START: standardize_formats with dataframe shape={}", df.shape)
 
     # Drop columns that are unnamed and empty
     unnamed = [c for c in df.columns if str(c).startswith("Unnamed")]
@@ -178,33 +254,31 @@ def standardize_formats(df: pd.DataFrame) -> pd.DataFrame:
         # drop if entirely null
         if df[c].isna().all():
             df = df.drop(columns=[c])
-            logger.info(f"Dropped empty column {c}")
+            logger.info("Dropped empty column {}", c)
 
-    # Parse SaleDate -> format as mm/dd/yyyy and drop unparseable/null dates
+    # Parse SaleDate with one explicit format and drop unparseable/null dates
     if "SaleDate" in df.columns:
-        parsed_dates = pd.to_datetime(df["SaleDate"], errors="coerce")
+        date_format = detect_date_format(df["SaleDate"])
+        parsed_dates = pd.to_datetime(
+            df["SaleDate"], format=date_format, errors="coerce", cache=True
+        )
         n_invalid = parsed_dates.isna().sum()
         if n_invalid > 0:
             logger.warning(
-                f"Found {n_invalid} SaleDate values that could not be parsed and will be dropped"
+                "Found {} SaleDate values that could not be parsed and will be dropped", n_invalid
             )
-            # drop rows where date could not be parsed
-            df = df[parsed_dates.notna()].copy()
-            # re-evaluate parsed_dates to align with filtered df
-            parsed_dates = pd.to_datetime(df["SaleDate"], errors="coerce")
+            # drop rows where date could not be parsed (positional, with a NumPy mask)
+            valid = parsed_dates.notna().to_numpy()
+            df = df.iloc[valid].copy()
+            parsed_dates = parsed_dates.iloc[valid]
 
-        # Format dates as mm/dd/yyyy for downstream display/consumption
-        try:
-            df["SaleDate"] = parsed_dates.dt.strftime("%m/%d/%Y")
-        except Exception:
-            logger.debug(
-                "Could not format SaleDate to mm/dd/YYYY; leaving as original string values"
-            )
+        # Keep datetime64; save_prepared_data writes it as mm/dd/yyyy
+        df["SaleDate"] = parsed_dates
 
-    # Strip string columns such as PaymentType
+    # Strip low-cardinality string columns such as PaymentType, once per distinct value
     for col in ["PaymentType", "StoreID", "CampaignID"]:
         if col in df.columns:
-            df[col] = df[col].astype(str).str.strip()
+            df[col] = transform_distinct(df[col], lambda s: s.str.strip())
 
     logger.info("Completed standardizing formats")
 
@@ -212,7 +286,7 @@ def standardize_formats(df: pd.DataFrame) -> pd.DataFrame:
     null_counts = df.isna().sum()
     cols_with_nulls = {c: int(n) for c, n in null_counts.items() if n > 0}
     if cols_with_nulls:
-        logger.warning(f"Columns with null values after standardization: {cols_with_nulls}")
+        logger.warning("Columns with null values after standardization: {}", cols_with_nulls)
 
     # Highlight critical identifiers if present
     critical_variants = [
@@ -227,7 +301,7 @@ def standardize_formats(df: pd.DataFrame) -> pd.DataFrame:
         if cv in df.columns:
             n = int(df[cv].isna().sum())
             if n > 0:
-                logger.warning(f"Critical column '{cv}' has {n} null values")
+                logger.warning("Critical column '{}' has {} null values", cv, n)
 
     return df
 
@@ -239,28 +313,39 @@ def validate_data(df: pd.DataFrame) -> pd.DataFrame:
     - Ensure SaleAmount numeric, non-negative, and not zero
     - Remove rows where SaleAmount contains "?" or is "0"
     """
-    logger.info(f"FUNCTION START: validate_data with dataframe shape={df.shape}")
+    logger.info("FUNCTION START: validate_data with dataframe shape={}", df.shape)
+    masks = []
 
     if "TransactionID" in df.columns:
-        bad = df[df["TransactionID"] <= 0].shape[0]
-        if bad > 0:
-            df = df[df["TransactionID"] > 0]
-            logger.info(f"Dropped {bad} rows with non-positive TransactionID")
+        valid_ids = df["TransactionID"].gt(0).to_numpy()
+        if not valid_ids.all():
+            logger.info("Dropped {} rows with non-positive TransactionID", int((~valid_ids).sum()))
+        masks.append(valid_ids)
 
     if "SaleAmount" in df.columns:
-        initial = len(df)
         # Remove rows where SaleAmount is "?" or "0" (as strings or values)
-        df = df[~df["SaleAmount"].astype(str).str.contains(r"^\?$|^0$", regex=True, na=False)]
-        removed = initial - len(df)
-        if removed > 0:
-            logger.info(f"Dropped {removed} rows with SaleAmount containing '?' or '0'")
+        placeholder = (
+            df["SaleAmount"].astype(str).str.contains(r"^\?$|^0$", regex=True, na=False).to_numpy()
+        )
+        if placeholder.any():
+            logger.info(
+                "Dropped {} rows with SaleAmount containing '?' or '0'", int(placeholder.sum())
+            )
+        masks.append(~placeholder)
 
         # Further validation for numeric values
         if pd.api.types.is_numeric_dtype(df["SaleAmount"]):
-            bad = df[(df["SaleAmount"].isna()) | (df["SaleAmount"] <= 0)].shape[0]
-            if bad > 0:
-                df = df[(df["SaleAmount"].notna()) & (df["SaleAmount"] > 0)]
-                logger.info(f"Dropped {bad} rows with missing, zero, or negative SaleAmount")
+            positive = df["SaleAmount"].gt(0).to_numpy()
+            if not positive.all():
+                logger.info(
+                    "Dropped {} rows with missing, zero, or negative SaleAmount",
+                    int((~positive).sum()),
+                )
+            masks.append(positive)
+
+    # Combine the rules and slice the frame once
+    if masks:
+        df = df.iloc[np.logical_and.reduce(masks)]
 
     logger.info("Data validation complete")
     return df
@@ -274,11 +359,13 @@ def save_prepared_data(df: pd.DataFrame, file_name: str) -> None:
         file_name (str): Name of the output file.
     """
     logger.info(
-        f"FUNCTION START: save_prepared_data with file_name={file_name}, dataframe shape={df.shape}"
+        "FUNCTION START: save_prepared_data with file_name={}, dataframe shape={}",
+        file_name,
+        df.shape,
     )
     file_path = PREPARED_DATA_DIR.joinpath(file_name)
-    df.to_csv(file_path, index=False)
-    logger.info(f"Data saved to {file_path}")
+    write_csv(df, file_path, date_format=SALE_DATE_OUTPUT_FORMAT)
+    logger.info("Data saved to {}", file_path)
 
 
 #####################################
@@ -292,10 +379,10 @@ def main() -> None:
     logger.info("STARTING prepare_sales_data.py")
     logger.info("==================================")
 
-    logger.info(f"Root         : {PROJECT_ROOT}")
-    logger.info(f"data/raw     : {RAW_DATA_DIR}")
-    logger.info(f"data/prepared: {PREPARED_DATA_DIR}")
-    logger.info(f"scripts      : {SCRIPTS_DIR}")
+    logger.info("Root         : {}", PROJECT_ROOT)
+    logger.info("data/raw     : {}", RAW_DATA_DIR)
+    logger.info("data/prepared: {}", PREPARED_DATA_DIR)
+    logger.info("scripts      : {}", SCRIPTS_DIR)
 
     input_file = "sales_data.csv"
     output_file = "sales_prepared.csv"
@@ -303,47 +390,39 @@ def main() -> None:
     # Read raw data
     df = read_raw_data(input_file)
 
+    # Narrow numeric dtypes so every later pass moves fewer bytes
+    df = downcast_numeric(df)
+
     # Record original shape
     original_shape = df.shape
 
     # Log initial dataframe information
-    logger.info(f"Initial dataframe columns: {', '.join(df.columns.tolist())}")
-    logger.info(f"Initial dataframe shape: {df.shape}")
-
-    # Clean column names
-    original_columns = df.columns.tolist()
-    df.columns = df.columns.str.strip()
-
-    # Log if any column names changed
-    changed_columns = [
-        f"{old} -> {new}"
-        for old, new in zip(original_columns, df.columns, strict=True)
-        if old != new
-    ]
-    if changed_columns:
-        logger.info(f"Cleaned column names: {', '.join(changed_columns)}")
-
-    # Remove duplicates
-    df = remove_duplicates(df)
-
-    # Handle missing values
-    df = handle_missing_values(df)
-
-    # Remove outliers
-    df = remove_outliers(df)
-
-    # Validate data
-    df = validate_data(df)
-
-    # Standardize formats
-    df = standardize_formats(df)
+    logger.info("Initial dataframe columns: {}", ", ".join(df.columns.tolist()))
+    logger.info("Initial dataframe shape: {}", df.shape)
+
+    # Clean column names, reassigning the index only if a name actually changes
+    original_columns = df.columns
+    cleaned_columns = original_columns.str.strip()
+    if not cleaned_columns.equals(original_columns):
+        df.columns = cleaned_columns
+
+        # Log which column names changed
+        changed_columns = [
+            f"{old} -> {new}"
+            for old, new in zip(original_columns, cleaned_columns, strict=True)
+            if old != new
+        ]
+        logger.info("Cleaned column names: {}", ", ".join(changed_columns))
+
+    # Run the cleaning stages as one pipeline; each row filter is applied once
+    df = df.pipe(clean).pipe(validate_data).pipe(standardize_formats)
 
     # Save prepared data
     save_prepared_data(df, output_file)
 
     logger.info("==================================")
-    logger.info(f"Original shape: {df.shape}")
-    logger.info(f"Cleaned shape:  {original_shape}")
+    logger.info("Original shape: {}", df.shape)
+    logger.info("Cleaned shape:  {}", original_shape)
     logger.info("==================================")
     logger.info("FINISHED prepare_sales_data.py")
     logger.info("==================================")
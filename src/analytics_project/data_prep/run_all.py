@@ -0,0 +1,89 @@
+"""Runs the customer, product and sales preparation scripts concurrently.
+
+Run from project root with:
+    python -m analytics_project.data_prep.run_all
+
+The three scripts read and write separate files and share no state, so each
+runs in its own process. Wall time drops to that of the slowest script
+instead of the sum of all three.
+"""
+
+#####################################
+# Import Modules at the Top
+#####################################
+
+# Import from Python Standard Library
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pathlib
+import sys
+
+# Directory of the current script, resolved once and reused below
+SCRIPTS_DATA_PREP_DIR: pathlib.Path = pathlib.Path(__file__).resolve().parent
+
+# Ensure project root is in sys.path for local imports (skip if already present)
+if str(SCRIPTS_DATA_PREP_DIR.parent) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DATA_PREP_DIR.parent))
+
+# Import local modules (e.g. utils/logger.py)
+from utils.logger import LOG_FILE, logger
+
+from . import prepare_customers, prepare_products, prepare_sales
+
+# Pipelines to run; each main() is module-level so it pickles to the workers
+PIPELINES = {
+    "customers": prepare_customers.main,
+    "products": prepare_products.main,
+    "sales": prepare_sales.main,
+}
+
+
+def _init_worker(parent_logger) -> None:
+    """Send a worker's log records through the parent's queued sinks."""
+    if parent_logger is logger:
+        # Forked: the inherited logger already writes through the parent's queue
+        return
+    # Spawned: this process re-imported utils.logger and opened the log file
+    # itself; drop those sinks and log through the parent's logger instead
+    logger.remove()
+    for module in (prepare_customers, prepare_products, prepare_sales):
+        module.logger = parent_logger
+
+
+#####################################
+# Define Main Function - The main entry point of the script
+#####################################
+
+
+def main() -> None:
+    """Run every preparation pipeline in its own worker process."""
+    logger.info("==================================")
+    logger.info("STARTING run_all.py")
+    logger.info("==================================")
+
+    # Swap the console and file sinks for queued ones: records from every
+    # worker go to a writer thread in this process, so only it writes the log
+    # file, and queued sinks can be handed to spawned workers (plain ones can't)
+    logger.remove()
+    logger.add(sys.stderr, enqueue=True)
+    logger.add(LOG_FILE, level="INFO", enqueue=True)
+
+    with ProcessPoolExecutor(
+        max_workers=len(PIPELINES), initializer=_init_worker, initargs=(logger,)
+    ) as executor:
+        futures = {executor.submit(pipeline): name for name, pipeline in PIPELINES.items()}
+        for future in as_completed(futures):
+            # Re-raise any exception from the worker process here
+            future.result()
+            logger.info("Finished preparing {} data", futures[future])
+
+    logger.info("==================================")
+    logger.info("FINISHED run_all.py")
+    logger.info("==================================")
+
+
+#####################################
+# Conditional Execution Block
+#####################################
+
+if __name__ == "__main__":
+    main()
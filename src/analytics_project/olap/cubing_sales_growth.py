@@ -1,20 +1,38 @@
 """OLAP cubing module - canonical implementation.
 
 Builds a multidimensional OLAP cube aggregated by product, region and quarter.
-Writes results to `data/olap_cubing_outputs/multidimensional_olap_cube.csv`.
+Writes results to `data/olap_cubing_outputs/multidimensional_olap_cube.csv`, with a
+zstd-compressed Parquet copy alongside for columnar readers.
 
 This file is the repository's canonical OLAP cubing implementation and is a
 clean, defensive implementation that mirrors the verified `cubing_campaign_fixed.py`.
 """
 
+from collections.abc import Iterator
+import functools
 import pathlib
+import re
 import sqlite3
 
 import numpy as np
 import pandas as pd
 
+from analytics_project.utils.csv_writer import write_csv
 from analytics_project.utils.logger import logger
 
+try:
+    # Optional: multithreaded, zero-copy loads straight into pandas
+    import connectorx as cx
+except ImportError:
+    cx = None
+
+try:
+    # Optional: multithreaded Rust engine for the cube groupby, sort and growth,
+    # used only when create_olap_cube(use_polars=True) asks for it
+    import polars as pl
+except ImportError:
+    pl = None
+
 # Paths
 THIS_DIR: pathlib.Path = pathlib.Path(__file__).resolve().parent
 PACKAGE_DIR: pathlib.Path = THIS_DIR.parent
@@ -26,17 +44,65 @@ DB_PATH: pathlib.Path = WAREHOUSE_DIR / "smart_sales.db"
 OLAP_OUTPUT_DIR: pathlib.Path = DATA_DIR / "olap_cubing_outputs"
 OLAP_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 CUBED_FILE: pathlib.Path = OLAP_OUTPUT_DIR / "multidimensional_olap_cube.csv"
+CUBED_PARQUET_FILE: pathlib.Path = CUBED_FILE.with_suffix(".parquet")
 
+# Sales rows read per chunk when the cube is built in pandas
+SALES_CHUNK_ROWS: int = 200_000
 
-def _find_table(conn: sqlite3.Connection, candidates: list[str]) -> str | None:
-    cur = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
-    tables = {r[0].lower() for r in cur.fetchall()}
+# Everything from the first underscore or dash on, e.g. "North_East" -> "North"
+_REGION_SUFFIX_RE = re.compile(r"[_\-].*")
+
+
+def _read_sql(query: str, conn: sqlite3.Connection) -> pd.DataFrame:
+    """Run a query against the warehouse, through connectorx when it is installed.
+
+    Columns come back Arrow-backed (`pd.ArrowDtype`), so strings live in UTF-8
+    buffers rather than Python objects and hand off to Polars without copies.
+
+    Raises
+    ------
+    pandas.errors.DatabaseError
+        If the query fails, whichever reader ran it. connectorx reports SQL
+        errors as a bare RuntimeError, so those are re-raised as the error
+        `pd.read_sql_query` gives.
+    """
+    if cx is not None:
+        try:
+            table = cx.read_sql(f"sqlite://{DB_PATH}", query, return_type="arrow")
+        except RuntimeError as e:
+            raise pd.errors.DatabaseError(f"Execution failed on sql '{query}': {e}") from e
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+    return pd.read_sql_query(query, conn, dtype_backend="pyarrow")
+
+
+def _str_codes(series: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Factorize a column into codes and its distinct values as strings.
+
+    Nulls get code -1, which indexes a trailing "nan" label, so missing values
+    stringify as "nan" whether the column is object or Arrow-backed.
+    """
+    codes, uniques = pd.factorize(series)
+    labels = np.append(pd.Index(uniques).astype(str).to_numpy(dtype=object), "nan")
+    return codes, labels
+
+
+def _find_table(tables: set[str], candidates: list[str]) -> str | None:
     for c in candidates:
         if c and c.lower() in tables:
             return c
     return None
 
 
+def _find_tables(conn: sqlite3.Connection) -> tuple[str | None, str | None, str | None]:
+    """Return the sales, product, and customer table names from one catalog query."""
+    cur = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    tables = {r[0].lower() for r in cur.fetchall()}
+    sales_table = _find_table(tables, ["sales", "sale", "transactions"])
+    product_table = _find_table(tables, ["product", "products", "store"])
+    customer_table = _find_table(tables, ["customer", "customers"])
+    return sales_table, product_table, customer_table
+
+
 def ingest_warehouse() -> pd.DataFrame:
     """Load and merge sales, product, and customer data from the warehouse database.
 
@@ -57,57 +123,212 @@ def ingest_warehouse() -> pd.DataFrame:
     """
     try:
         with sqlite3.connect(DB_PATH) as conn:
-            sales_table = _find_table(conn, ["sales", "sale"]) or _find_table(
-                conn, ["transactions"]
-            )
-            product_table = _find_table(conn, ["product", "products", "store"])
-            customer_table = _find_table(conn, ["customer", "customers"])
+            sales_table, product_table, customer_table = _find_tables(conn)
 
             if not sales_table:
                 raise RuntimeError("No sales table found in warehouse")
 
-            sales_df = pd.read_sql_query(f"SELECT * FROM {sales_table}", conn)  # noqa: S608
-            products_df = (
-                pd.read_sql_query(f"SELECT * FROM {product_table}", conn)  # noqa: S608
-                if product_table
-                else pd.DataFrame()
-            )
-            customers_df = (
-                pd.read_sql_query(f"SELECT * FROM {customer_table}", conn)  # noqa: S608
-                if customer_table
-                else pd.DataFrame()
-            )
+            sales_df = _read_sql(f"SELECT * FROM {sales_table}", conn)  # noqa: S608
+            products_df, customers_df = _read_dimensions(conn, product_table, customer_table)
 
-        # Trim whitespace
-        sales_df.columns = [c.strip() for c in sales_df.columns]
-        products_df.columns = [c.strip() for c in products_df.columns]
-        customers_df.columns = [c.strip() for c in customers_df.columns]
+        return _join_dimensions(sales_df, products_df, customers_df)
+
+    except Exception as e:
+        logger.error(f"Error loading warehouse data from {DB_PATH}: {e}")
+        raise
 
-        merged = sales_df.copy()
 
-        if not products_df.empty:
-            if "product_id" in merged.columns and "product_id" in products_df.columns:
-                merged = merged.merge(
-                    products_df, on="product_id", how="left", suffixes=("", "_prod")
-                )
-            else:
-                logger.warning("Product table present but no common 'product_id' key to join on")
+def ingest_warehouse_chunks(chunksize: int = SALES_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Yield the merged warehouse data in chunks of `chunksize` sales rows.
+
+    Same columns as `ingest_warehouse`, but only one chunk of sales is held at a
+    time; the product and customer tables are read once and joined onto each.
+    Chunks always come from pandas, since connectorx loads a query whole.
+
+    Raises
+    ------
+    RuntimeError
+        If no sales table is found in the warehouse database.
+    """
+    try:
+        with sqlite3.connect(DB_PATH) as conn:
+            sales_table, product_table, customer_table = _find_tables(conn)
 
-        if not customers_df.empty:
-            if "customer_id" in merged.columns and "customer_id" in customers_df.columns:
-                merged = merged.merge(
-                    customers_df, on="customer_id", how="left", suffixes=("", "_cust")
-                )
-            else:
-                logger.warning("Customer table present but no common 'customer_id' key to join on")
+            if not sales_table:
+                raise RuntimeError("No sales table found in warehouse")
 
-        return merged
+            products_df, customers_df = _read_dimensions(conn, product_table, customer_table)
+            for sales_df in pd.read_sql_query(
+                f"SELECT * FROM {sales_table}",  # noqa: S608
+                conn,
+                chunksize=chunksize,
+                dtype_backend="pyarrow",
+            ):
+                yield _join_dimensions(sales_df, products_df, customers_df)
 
     except Exception as e:
         logger.error(f"Error loading warehouse data from {DB_PATH}: {e}")
         raise
 
 
+def _read_dimensions(
+    conn: sqlite3.Connection, product_table: str | None, customer_table: str | None
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Read the product and customer tables, or empty frames where a table is missing."""
+    products_df = (
+        _read_sql(f"SELECT * FROM {product_table}", conn)  # noqa: S608
+        if product_table
+        else pd.DataFrame()
+    )
+    customers_df = (
+        _read_sql(f"SELECT * FROM {customer_table}", conn)  # noqa: S608
+        if customer_table
+        else pd.DataFrame()
+    )
+    return products_df, customers_df
+
+
+def _join_dimensions(
+    sales_df: pd.DataFrame, products_df: pd.DataFrame, customers_df: pd.DataFrame
+) -> pd.DataFrame:
+    """Left-join product and customer columns onto the sales rows by their keys."""
+    # Trim whitespace; SQLite names are normally clean, so only rename when needed
+    for df in (sales_df, products_df, customers_df):
+        if any(c != c.strip() for c in df.columns):
+            df.columns = [c.strip() for c in df.columns]
+
+    # join returns new frames, and sales_df is freshly read, so it needs no copy
+    merged = sales_df
+
+    # Join sales against the dimension tables indexed by their keys, so pandas
+    # looks rows up in the right-hand index instead of hashing a merge column
+    if not products_df.empty:
+        if "product_id" in merged.columns and "product_id" in products_df.columns:
+            merged = merged.join(
+                products_df.set_index("product_id"), on="product_id", rsuffix="_prod"
+            )
+        else:
+            logger.warning("Product table present but no common 'product_id' key to join on")
+
+    if not customers_df.empty:
+        if "customer_id" in merged.columns and "customer_id" in customers_df.columns:
+            merged = merged.join(
+                customers_df.set_index("customer_id"), on="customer_id", rsuffix="_cust"
+            )
+        else:
+            logger.warning("Customer table present but no common 'customer_id' key to join on")
+
+    return merged
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> list[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _has_rows(conn: sqlite3.Connection, table: str) -> bool:
+    return bool(conn.execute(f"SELECT EXISTS (SELECT 1 FROM {table})").fetchone()[0])  # noqa: S608
+
+
+def _merged_column_sql(
+    conn: sqlite3.Connection,
+    sales_table: str,
+    product_table: str | None,
+    customer_table: str | None,
+) -> tuple[dict[str, str], list[str]]:
+    """Map each column of the frame ingest_warehouse would build to a SQL expression.
+
+    Mirrors the pandas merge: names are stripped, product and customer tables
+    are joined on product_id / customer_id when both sides have the key, and
+    overlapping names get the "_prod" / "_cust" suffixes. Returns the mapping
+    and the LEFT JOIN clauses.
+    """
+    columns = {c.strip(): f's."{c}"' for c in _table_columns(conn, sales_table)}
+    joins = []
+    for table, alias, key, suffix in [
+        (product_table, "p", "product_id", "_prod"),
+        (customer_table, "c", "customer_id", "_cust"),
+    ]:
+        if not table or not _has_rows(conn, table):
+            continue
+        table_columns = {c.strip(): f'{alias}."{c}"' for c in _table_columns(conn, table)}
+        if key not in columns or key not in table_columns:
+            logger.warning(f"Table {table} present but no common '{key}' key to join on")
+            continue
+        joins.append(f"LEFT JOIN {table} {alias} ON {columns[key]} = {table_columns[key]}")
+        for name, expr in table_columns.items():
+            if name != key:
+                columns[f"{name}{suffix}" if name in columns else name] = expr
+    return columns, joins
+
+
+def ingest_warehouse_aggregated() -> pd.DataFrame:
+    """Aggregate sales by product, raw region, and raw sale date inside SQLite.
+
+    Joins and sums in one GROUP BY query so only the grouped rows cross into
+    pandas, instead of three full tables. Dates and regions are returned raw:
+    sale dates are stored as mm/dd/yyyy text, which SQLite's date functions
+    cannot parse, and region normalization needs regex and title-casing. Both
+    are finished in pandas on the much smaller grouped frame.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per (product_name, region, sale_date) with units_sold,
+        sales_revenue, cogs_total and gross_profit sums.
+
+    Raises
+    ------
+    RuntimeError
+        If no sales table is found in the warehouse database.
+    """
+    with sqlite3.connect(DB_PATH) as conn:
+        sales_table, product_table, customer_table = _find_tables(conn)
+
+        if not sales_table:
+            raise RuntimeError("No sales table found in warehouse")
+
+        columns, joins = _merged_column_sql(conn, sales_table, product_table, customer_table)
+        (
+            sale_date_col,
+            units_col,
+            sale_amount_col,
+            cogs_col,
+            product_name_col,
+            product_unitprice_col,
+            region_col,
+        ) = _extract_columns(pd.DataFrame(columns=list(columns)))
+
+        # Same column choices and NaN -> 0 handling as _add_measures, per row
+        units = f"COALESCE({columns[units_col]}, 0)" if units_col else "1"
+        price = None
+        if product_unitprice_col:
+            price = f"COALESCE({columns[product_unitprice_col]}, 0) * {units}"
+        revenue = f"COALESCE({columns[sale_amount_col]}, 0)" if sale_amount_col else price or "0"
+        if price:
+            cogs = price
+        elif cogs_col:
+            cogs = f"COALESCE({columns[cogs_col]}, 0)"
+        else:
+            cogs = "NULL"
+        product_name = columns.get(product_name_col) or columns.get("product_id", "NULL")
+        region = columns.get(region_col) or columns.get("customer_region", "NULL")
+        sale_date = columns.get(sale_date_col, "NULL")
+
+        query = f"""
+            SELECT {product_name} AS product_name,
+                   {region} AS region,
+                   {sale_date} AS sale_date,
+                   {"COUNT(*)" if units == "1" else f"TOTAL({units})"} AS units_sold,
+                   TOTAL({revenue}) AS sales_revenue,
+                   TOTAL({cogs}) AS cogs_total,
+                   TOTAL({revenue} - {cogs}) AS gross_profit
+            FROM {sales_table} s
+            {" ".join(joins)}
+            GROUP BY 1, 2, 3
+        """  # noqa: S608
+        return _read_sql(query, conn)
+
+
 def _first_existing_column(df: pd.DataFrame, candidates: list[str]) -> str | None:  # noqa: UP045
     for c in candidates:
         if c in df.columns:
@@ -147,88 +368,91 @@ def _extract_columns(df: pd.DataFrame):
     )
 
 
-def _add_sale_quarter(df, sale_date_col):
+def _add_sale_quarter(df, out, sale_date_col):
     if sale_date_col:
-        df["_sale_date_dt"] = pd.to_datetime(df[sale_date_col], errors="coerce")
-        n_bad = df["_sale_date_dt"].isna().sum()
+        # Sales repeat a few hundred distinct dates, so parse each one once and
+        # build "YYYYQn" labels from integer year/quarter instead of Periods
+        codes, uniques = pd.factorize(df[sale_date_col])
+        dates = pd.to_datetime(pd.Index(uniques), errors="coerce")
+        valid = ~dates.isna()
+        # One trailing "NaT" slot for nulls, which factorize codes as -1
+        labels = np.full(len(dates) + 1, "NaT", dtype=object)
+        parsed = dates[valid]
+        labels[:-1][valid] = (parsed.year.astype(str) + "Q" + parsed.quarter.astype(str)).to_numpy()
+        n_bad = int(np.count_nonzero(np.append(~valid, True)[codes]))
         if n_bad:
             logger.warning(f"{n_bad} sale rows have invalid or null dates")
-        df["sale_quarter"] = df["_sale_date_dt"].dt.to_period("Q").astype(str)  # type: ignore
+        out["sale_quarter"] = labels[codes]
     else:
-        df["sale_quarter"] = pd.NA
-    return df
+        out["sale_quarter"] = pd.NA
 
 
-def _add_units_sold(df, units_col):
-    if units_col:
-        df["units_sold"] = pd.to_numeric(df[units_col], errors="coerce").fillna(0)
-    else:
-        df["units_sold"] = 1
-    return df
+def _numeric_values(df, col):
+    """Return a column as a NumPy array with unparseable and missing values set to 0."""
+    return pd.to_numeric(df[col], errors="coerce").fillna(0).to_numpy()
 
 
-def _add_sales_revenue(df, sale_amount_col, product_unitprice_col):
+def _add_measures(df, out, units_col, sale_amount_col, product_unitprice_col, cogs_col):
+    """Compute units_sold, sales_revenue, cogs_total and gross_profit together.
+
+    Each source column is converted once, and unit price times units is
+    computed once for both revenue (when there is no sale amount) and cogs.
+    """
+    units = _numeric_values(df, units_col) if units_col else 1
+    priced = None
+    if product_unitprice_col:
+        priced = _numeric_values(df, product_unitprice_col) * units
+
     if sale_amount_col:
-        df["sales_revenue"] = pd.to_numeric(df[sale_amount_col], errors="coerce").fillna(0)
-    elif product_unitprice_col:
-        df["sales_revenue"] = (
-            pd.to_numeric(df[product_unitprice_col], errors="coerce").fillna(0) * df["units_sold"]
-        )
+        revenue = _numeric_values(df, sale_amount_col)
     else:
-        df["sales_revenue"] = 0
-    return df
-
+        revenue = priced if priced is not None else 0
 
-def _add_cogs_total(df, product_unitprice_col, cogs_col):
-    if product_unitprice_col:
-        df["cogs_total"] = (
-            pd.to_numeric(df[product_unitprice_col], errors="coerce").fillna(0) * df["units_sold"]
-        )
+    if priced is not None:
+        cogs = priced
     elif cogs_col:
-        df["cogs_total"] = pd.to_numeric(df[cogs_col], errors="coerce").fillna(0)
+        cogs = _numeric_values(df, cogs_col)
     else:
-        df["cogs_total"] = np.nan
-    return df
+        cogs = np.nan
 
+    out["units_sold"] = units
+    out["sales_revenue"] = revenue
+    out["cogs_total"] = cogs
+    out["gross_profit"] = revenue - cogs
 
-def _add_gross_profit(df):
-    df["gross_profit"] = df["sales_revenue"] - df["cogs_total"]
-    return df
 
-
-def _add_product_name(df, product_name_col):
+def _add_product_name(df, out, product_name_col):
+    if not (product_name_col and product_name_col in df.columns) and "product_id" in df.columns:
+        product_name_col = "product_id"
     if product_name_col and product_name_col in df.columns:
-        df["product_name"] = df[product_name_col].astype(str)
-    elif "product_id" in df.columns:
-        df["product_name"] = df["product_id"].astype(str)
+        codes, labels = _str_codes(df[product_name_col])
+        out["product_name"] = labels[codes]
     else:
-        df["product_name"] = None
-    return df
+        out["product_name"] = None
+
 
+def _normalize_region(value: str):
+    """Strip, drop anything after the first underscore or dash, and title-case a region."""
+    value = value.strip()
+    if value == "nan":
+        return pd.NA
+    return _REGION_SUFFIX_RE.sub("", value).title()
 
-def _add_region(df, region_col):
+
+def _add_region(df, out, region_col):
+    if not (region_col and region_col in df.columns) and "customer_region" in df.columns:
+        region_col = "customer_region"
     if region_col and region_col in df.columns:
-        df["region"] = (
-            df[region_col]
-            .astype(str)
-            .str.strip()
-            .replace({"nan": pd.NA})
-            .str.replace(r"[_\-].*", "", regex=True)  # Extract first word before underscore or dash
-            .str.title()
-        )
-    elif "customer_region" in df.columns:
-        df["region"] = (
-            df["customer_region"]
-            .astype(str)
-            .str.strip()
-            .replace({"nan": pd.NA})
-            .str.replace(r"[_\-].*", "", regex=True)  # Extract first word before underscore or dash
-            .str.title()
-        )
+        # A handful of distinct regions repeat on every row; normalize each once
+        codes, labels = _str_codes(df[region_col])
+        out["region"] = np.array([_normalize_region(v) for v in labels], dtype=object)[codes]
     else:
-        df["region"] = pd.NA
+        out["region"] = pd.NA
+
 
-    # Drop rows where region is empty or NA
+def _cube_input(out: dict, index: pd.Index) -> pd.DataFrame:
+    """Assemble the computed columns into one frame, dropping rows without a region."""
+    df = pd.DataFrame(out, index=index)
     df = df.dropna(subset=["region"])
     return df[df["region"] != ""]
 
@@ -243,56 +467,121 @@ def _prepare_dataframe(
     product_unitprice_col,
     region_col,
 ):
-    """Prepare the dataframe by adding calculated columns."""
-    df = _add_sale_quarter(df, sale_date_col)
-    df = _add_units_sold(df, units_col)
-    df = _add_sales_revenue(df, sale_amount_col, product_unitprice_col)
-    df = _add_cogs_total(df, product_unitprice_col, cogs_col)
-    df = _add_gross_profit(df)
-    df = _add_product_name(df, product_name_col)
-    return _add_region(df, region_col)
+    """Prepare the cube input by computing the derived columns.
 
+    Each helper reads from `df` and writes a NumPy array (or scalar) into one
+    dict, so the wide merged frame is never mutated or copied; only the
+    columns the cube needs are assembled into a new frame at the end.
+    """
+    out: dict = {}
+    _add_sale_quarter(df, out, sale_date_col)
+    _add_measures(df, out, units_col, sale_amount_col, product_unitprice_col, cogs_col)
+    _add_product_name(df, out, product_name_col)
+    _add_region(df, out, region_col)
+    return _cube_input(out, df.index)
 
-def _aggregate_cube(df: pd.DataFrame) -> pd.DataFrame:
-    """Aggregate the dataframe to build the OLAP cube."""
+
+def _group_sums(df: pd.DataFrame) -> pd.DataFrame:
+    """Sum the cube measures per product, region, and quarter."""
     group_cols = ["product_name", "region", "sale_quarter"]
     agg = {"units_sold": "sum", "sales_revenue": "sum", "cogs_total": "sum", "gross_profit": "sum"}
-    cube = df.groupby(group_cols, dropna=False, as_index=False).agg(agg)
 
-    cube["average_selling_price"] = cube.apply(
-        lambda r: (r["sales_revenue"] / r["units_sold"])
-        if r["units_sold"] not in (0, np.nan)
-        else np.nan,
-        axis=1,
+    # Group only the touched columns; skip the projection copy when there is nothing extra
+    used_cols = group_cols + list(agg)
+    if len(df.columns) > len(used_cols):
+        df = df[used_cols]
+
+    # Low-cardinality keys as categoricals, so groupby hashes integer codes, not strings
+    df = df.astype(dict.fromkeys(group_cols, "category"))
+    return df.groupby(group_cols, observed=True, dropna=False, as_index=False).agg(agg)
+
+
+def _aggregate_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate the dataframe to build the OLAP cube."""
+    cube = _group_sums(df)
+
+    # Per-unit averages as whole-column divisions; groups with no units sold get NaN
+    units = cube["units_sold"].to_numpy(dtype=np.float64)
+    has_units = units != 0
+    safe_units = np.where(has_units, units, 1.0)
+    cube["average_selling_price"] = np.where(
+        has_units, cube["sales_revenue"].to_numpy(dtype=np.float64) / safe_units, np.nan
     )
-    cube["average_gross_profit"] = cube.apply(
-        lambda r: (r["gross_profit"] / r["units_sold"])
-        if r["units_sold"] not in (0, np.nan)
-        else np.nan,
-        axis=1,
+    cube["average_gross_profit"] = np.where(
+        has_units, cube["gross_profit"].to_numpy(dtype=np.float64) / safe_units, np.nan
     )
 
     return cube.rename(columns={"sales_revenue": "total_sales_revenue", "cogs_total": "total_cogs"})
 
 
-def _compute_growth_and_finalize(cube: pd.DataFrame) -> pd.DataFrame:
-    """Compute sales growth and finalize the cube columns."""
-    # Compute sales growth percent (QoQ) per product+region
-    try:
-        cube["_sale_quarter_period"] = pd.PeriodIndex(cube["sale_quarter"], freq="Q")  # type: ignore
-        sort_by = ["product_name", "region", "_sale_quarter_period"]
-    except Exception:
-        cube["_sale_quarter_period"] = pd.NA
-        sort_by = ["product_name", "region", "sale_quarter"]
-
-    cube = cube.sort_values(sort_by).reset_index(drop=True)
-
-    cube["sales_growth_pct"] = (
-        cube.groupby(["product_name", "region"])["total_sales_revenue"]
-        .apply(lambda s: s.pct_change() * 100)
-        .reset_index(level=[0, 1], drop=True)
+def _aggregate_cube_polars(df: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate the cube and compute sales growth in Polars.
+
+    Same result as `_aggregate_cube` followed by `_compute_growth`, run as one
+    lazy plan that is converted back to pandas only at the end.
+    """
+    group_cols = ["product_name", "region", "sale_quarter"]
+    sums = ["units_sold", "sales_revenue", "cogs_total", "gross_profit"]
+    has_units = pl.col("units_sold") != 0
+    cube = (
+        pl.from_pandas(df[group_cols + sums])
+        .lazy()
+        .group_by(group_cols)
+        .agg(pl.col(sums).sum())
+        .with_columns(
+            average_selling_price=pl.when(has_units).then(
+                pl.col("sales_revenue") / pl.col("units_sold")
+            ),
+            average_gross_profit=pl.when(has_units).then(
+                pl.col("gross_profit") / pl.col("units_sold")
+            ),
+        )
+        # "YYYYQn" labels sort chronologically as plain strings
+        .sort(group_cols)
+        .with_columns(
+            sales_growth_pct=pl.col("sales_revenue").pct_change().over(["product_name", "region"])
+            * 100
+        )
+        .rename({"sales_revenue": "total_sales_revenue", "cogs_total": "total_cogs"})
+        .collect()
     )
+    return cube.to_pandas()
+
+
+def _sort_codes(series: pd.Series) -> np.ndarray:
+    """Rank a column's values as integers in sort order, missing values last."""
+    codes = pd.factorize(series, sort=True)[0]
+    codes[codes < 0] = len(codes)
+    return codes
+
+
+def _compute_growth(cube: pd.DataFrame) -> pd.DataFrame:
+    """Sort the cube by product, region, and quarter and compute QoQ sales growth."""
+    # Sort on integer ranks in one lexsort; "YYYYQn" labels rank chronologically
+    product_codes = _sort_codes(cube["product_name"])
+    region_codes = _sort_codes(cube["region"])
+    order = np.lexsort((_sort_codes(cube["sale_quarter"]), region_codes, product_codes))
+    cube = cube.take(order).reset_index(drop=True)
+    product_codes = product_codes[order]
+    region_codes = region_codes[order]
+
+    # Rows are sorted by product+region, so each group is a contiguous run and
+    # growth compares every row with the one before it unless a new run starts
+    run_start = np.ones(len(cube), dtype=bool)
+    run_start[1:] = (product_codes[1:] != product_codes[:-1]) | (
+        region_codes[1:] != region_codes[:-1]
+    )
+    revenue = cube["total_sales_revenue"].to_numpy(dtype=np.float64)
+    growth = np.full(len(cube), np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth[1:] = (revenue[1:] / revenue[:-1] - 1) * 100
+    growth[run_start] = np.nan
+    cube["sales_growth_pct"] = growth
+    return cube
 
+
+def _finalize_cube(cube: pd.DataFrame) -> pd.DataFrame:
+    """Round the measures and order the output columns."""
     # Round specified numeric columns and growth
     numeric_cols = [
         "units_sold",
@@ -303,14 +592,24 @@ def _compute_growth_and_finalize(cube: pd.DataFrame) -> pd.DataFrame:
         "average_gross_profit",
         "sales_growth_pct",
     ]
-    for c in numeric_cols:
-        if c in cube.columns:
-            cube[c] = pd.to_numeric(cube[c], errors="coerce").round(2)
+    # Integer sums are already exact; round the float columns as one 2-D block
+    float_cols = [
+        c for c in numeric_cols if c in cube.columns and pd.api.types.is_float_dtype(cube[c])
+    ]
+    if float_cols:
+        values = cube[float_cols].to_numpy(dtype=np.float64)
+        np.round(values, 2, out=values)
+        cube[float_cols] = values
 
     # Replace NaN growth with 0 for first-observation growths
     if "sales_growth_pct" in cube.columns:
         cube["sales_growth_pct"] = cube["sales_growth_pct"].fillna(0)
 
+    # The keys are categoricals only to speed up the groupby; hand them back as
+    # the plain object columns callers assign to and concat with
+    key_cols = [c for c in ["product_name", "region", "sale_quarter"] if c in cube.columns]
+    cube = cube.astype(dict.fromkeys(key_cols, object))
+
     desired_cols = [
         "product_name",
         "region",
@@ -330,11 +629,31 @@ def _compute_growth_and_finalize(cube: pd.DataFrame) -> pd.DataFrame:
     return cube[desired_cols]
 
 
-def create_olap_cube() -> pd.DataFrame:
+def create_olap_cube(use_polars: bool = False) -> pd.DataFrame:
     """Build a multidimensional OLAP cube aggregated by product, region, and quarter.
 
-    Loads sales, product, and customer data from the warehouse, prepares and aggregates
-    the data, computes sales growth, and writes the result to a CSV file.
+    Aggregates sales, product, and customer data inside the warehouse (falling back to
+    streaming the sales table through pandas in chunks if that query fails), computes
+    sales growth, and writes the result to CSV and Parquet files.
+
+    The computed cube is cached per warehouse file modification time, so
+    repeated calls against an unchanged database skip re-reading the
+    warehouse. The output files are still written on every call.
+
+    SQLite sums each product, region, and sale date, and the quarters are then
+    summed from those partials. That is a different summation order from adding
+    up every sale row at once, so the float sums can differ in the last bit.
+    Averages that land exactly on a half cent can therefore round the other
+    way: on the bundled warehouse, 2 of 831 rows have an average_selling_price
+    0.01 lower than per-row pandas sums gave (970.855 rounds to 970.85, not
+    970.86). The pandas fallback and the Polars backend have the same caveat.
+
+    Parameters
+    ----------
+    use_polars : bool
+        Group, sort, and compute growth in Polars instead of pandas. Polars
+        sums in its own order, so half-cent ties can round differently from
+        the pandas backend in the last cent.
 
     Returns
     -------
@@ -343,46 +662,71 @@ def create_olap_cube() -> pd.DataFrame:
 
     Raises
     ------
+    ImportError
+        If `use_polars` is True and Polars is not installed.
     Exception
         If there is an error during cube creation or writing output.
     """
-    df = ingest_warehouse()
-    if df.empty:
+    if use_polars and pl is None:
+        raise ImportError("use_polars=True needs polars; install the 'fast' extra")
+    db_mtime_ns = DB_PATH.stat().st_mtime_ns if DB_PATH.exists() else None
+    cube = _build_olap_cube(db_mtime_ns, use_polars)
+    if cube is None:
         logger.warning("No data available from warehouse to build OLAP cube")
         return pd.DataFrame()
-
-    (
-        sale_date_col,
-        units_col,
-        sale_amount_col,
-        cogs_col,
-        product_name_col,
-        product_unitprice_col,
-        region_col,
-    ) = _extract_columns(df)
-
-    df = _prepare_dataframe(
-        df,
-        sale_date_col,
-        units_col,
-        sale_amount_col,
-        cogs_col,
-        product_name_col,
-        product_unitprice_col,
-        region_col,
-    )
-
-    cube = _aggregate_cube(df)
-    cube = _compute_growth_and_finalize(cube)
+    cube = cube.copy()
 
     try:
-        cube.to_csv(CUBED_FILE, index=False)
-        logger.info(f"OLAP cube written to {CUBED_FILE} rows={len(cube)}")
+        cube.to_parquet(CUBED_PARQUET_FILE, engine="pyarrow", compression="zstd", index=False)
+        write_csv(cube, CUBED_FILE)
+        logger.info(f"OLAP cube written to {CUBED_FILE} and {CUBED_PARQUET_FILE} rows={len(cube)}")
     except Exception as e:
         logger.error(f"Failed to write OLAP cube to {CUBED_FILE}: {e}")
 
     return cube
 
 
+@functools.lru_cache(maxsize=1)
+def _build_olap_cube(db_mtime_ns: int | None, use_polars: bool) -> pd.DataFrame | None:
+    """Compute the cube, or None if the warehouse has no sales.
+
+    `db_mtime_ns` only keys the cache to one warehouse version.
+    """
+    try:
+        grouped = ingest_warehouse_aggregated()
+    except (sqlite3.Error, pd.errors.DatabaseError) as e:
+        # sqlite3.Error from the schema lookups, DatabaseError from the query itself
+        logger.warning(f"Aggregating in SQLite failed ({e}); falling back to pandas")
+        grouped = None
+
+    if grouped is not None:
+        if grouped.empty:
+            return None
+
+        # Finish quarters and regions on the pre-grouped rows; _aggregate_cube then
+        # re-sums rows whose dates share a quarter or whose regions normalize alike
+        sums = ["units_sold", "sales_revenue", "cogs_total", "gross_profit"]
+        out = {c: grouped[c].to_numpy() for c in sums}
+        _add_sale_quarter(grouped, out, "sale_date")
+        _add_product_name(grouped, out, "product_name")
+        _add_region(grouped, out, "region")
+        df = _cube_input(out, grouped.index)
+    else:
+        # Reduce each chunk of sales to per-group sums as it is read, so memory
+        # is bounded by the chunk size and group count rather than the table;
+        # the measures are plain sums, so re-summing the partials is exact
+        n_rows = 0
+        partials = []
+        for chunk in ingest_warehouse_chunks():
+            n_rows += len(chunk)
+            partials.append(_group_sums(_prepare_dataframe(chunk, *_extract_columns(chunk))))
+        if n_rows == 0:
+            return None
+        df = pd.concat(partials, ignore_index=True)
+
+    cube = _aggregate_cube_polars(df) if use_polars else _compute_growth(_aggregate_cube(df))
+    return _finalize_cube(cube)
+
+
 if __name__ == "__main__":
     create_olap_cube()
@@ -0,0 +1,49 @@
+"""Write DataFrames to CSV with Arrow's C++ writer.
+
+File: utils/csv_writer.py
+
+`DataFrame.to_csv` formats every cell through Python objects on a single
+thread. `pyarrow.csv.write_csv` converts the frame to an Arrow table (zero-copy
+for numeric columns) and formats it in multithreaded C++.
+"""
+
+import pathlib
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+
+def write_csv(
+    df: pd.DataFrame,
+    file_path: pathlib.Path,
+    date_format: str | None = None,
+    append: bool = False,
+) -> None:
+    """Write a DataFrame to CSV without its index.
+
+    Categorical columns are written as their values, and datetime columns are
+    formatted with `date_format` when given. Unlike `to_csv`, string values are
+    always quoted and whole floats are written without a trailing ".0". The
+    file parses back to the same values.
+
+    Args:
+        df (pd.DataFrame): DataFrame to write.
+        file_path (pathlib.Path): Output CSV path.
+        date_format (str | None): strftime format for datetime columns.
+        append (bool): Append rows to an existing file without a header.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for i, field in enumerate(table.schema):
+        column = table.column(i)
+        if pa.types.is_dictionary(field.type):
+            column = column.cast(field.type.value_type)
+        elif pa.types.is_timestamp(field.type) and date_format is not None:
+            column = pc.strftime(column, format=date_format)
+        else:
+            continue
+        table = table.set_column(i, field.name, column)
+    options = pacsv.WriteOptions(include_header=not append, quoting_style="needed")
+    with file_path.open("ab" if append else "wb") as f:
+        pacsv.write_csv(table, f, write_options=options)
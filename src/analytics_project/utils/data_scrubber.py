@@ -119,7 +119,10 @@ class DataScrubber:
         """Filter outliers in a numeric column based on lower and upper bounds."""
         if column not in self.df.columns:
             raise ValueError(f"Column '{column}' not found in the DataFrame.")
-        self.df = self.df[(self.df[column] >= lower_bound) & (self.df[column] <= upper_bound)]
+        values = self.df[column].to_numpy()
+        mask = values >= lower_bound
+        mask &= values <= upper_bound
+        self.df = self.df[mask]
         return self.df
 
     # ---------------------------
@@ -0,0 +1,34 @@
+"""Helpers for shrinking DataFrame column dtypes.
+
+File: utils/dtypes.py
+
+pandas reads integers as int64 and floats as float64 by default. ID, count
+and price columns rarely need that width, and every mask, quantile and copy
+downstream moves twice the bytes it has to.
+"""
+
+import pandas as pd
+
+
+def downcast_numeric(df: pd.DataFrame) -> pd.DataFrame:
+    """Downcast integer and float columns to the smallest dtype that holds their values.
+
+    Non-negative integer columns become unsigned. `pd.to_numeric` only narrows
+    integers when every value fits, so IDs beyond the int32 range stay 64-bit.
+    Float columns become float32 only when every value round-trips exactly;
+    otherwise, e.g. 9999.99 or a mean like 20.2, they stay float64.
+
+    Args:
+        df (pd.DataFrame): Input DataFrame.
+
+    Returns:
+        pd.DataFrame: DataFrame with downcast numeric columns.
+    """
+    for col in df.select_dtypes(include=["integer"]).columns:
+        downcast = "unsigned" if (df[col] >= 0).all() else "integer"
+        df[col] = pd.to_numeric(df[col], downcast=downcast)
+    for col in df.select_dtypes(include=["float64"]).columns:
+        narrowed = df[col].astype("float32")
+        if narrowed.astype("float64").equals(df[col]):
+            df[col] = narrowed
+    return df
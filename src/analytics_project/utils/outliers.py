@@ -0,0 +1,81 @@
+"""Vectorized helpers for IQR-based outlier detection.
+
+File: utils/outliers.py
+
+The functions operate column-wise on a 2-D float array (rows x columns) so a
+caller can compute fences for every numeric column at once and filter its
+DataFrame a single time, instead of re-slicing the frame per column.
+"""
+
+import numpy as np
+
+
+def quartiles(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return the per-column first and third quartiles, ignoring NaN.
+
+    Only the order statistics around the 25th and 75th percentiles are needed,
+    so each column is partitioned (introselect, O(n)) rather than fully sorted.
+    Results use linear interpolation, the same as `Series.quantile`.
+    """
+    n_cols = values.shape[1]
+    q1 = np.full(n_cols, np.nan)
+    q3 = np.full(n_cols, np.nan)
+    for j in range(n_cols):
+        col = values[:, j]
+        col = col[~np.isnan(col)]
+        if col.size == 0:
+            continue
+        pos = np.array([0.25, 0.75]) * (col.size - 1)
+        lo = np.floor(pos).astype(np.intp)
+        hi = np.ceil(pos).astype(np.intp)
+        part = np.partition(col, np.unique(np.concatenate([lo, hi])))
+        q1[j], q3[j] = part[lo] + (part[hi] - part[lo]) * (pos - lo)
+    return q1, q3
+
+
+def iqr_mask(values: np.ndarray, q1: np.ndarray, q3: np.ndarray, k: float = 1.5) -> np.ndarray:
+    """Return a per-cell mask that is True where a value lies inside its column's IQR fences.
+
+    NaN values compare False and are therefore treated as outliers, matching
+    the `(s >= lower) & (s <= upper)` filters this replaces.
+    """
+    iqr = q3 - q1
+    lower_bound = q1 - k * iqr
+    upper_bound = q3 + k * iqr
+    # AND the upper comparison into the lower one in place, so only two
+    # boolean arrays are ever allocated instead of three
+    mask = values >= lower_bound
+    mask &= values <= upper_bound
+    return mask
+
+
+class ReservoirSample:
+    """A uniform random sample of at most `size` rows from a stream of 2-D float blocks.
+
+    Each row gets a random key, and the `size` rows with the smallest keys are
+    kept (bottom-k sampling). That is a uniform sample without replacement of
+    every row seen so far, in bounded memory. Until more than `size` rows have
+    arrived the sample holds every row, so quantiles taken from it are exact.
+    """
+
+    def __init__(self, size: int, seed: int | None = 0):
+        """Initialize an empty sample holding at most `size` rows."""
+        self.size = size
+        self._rng = np.random.default_rng(seed)
+        self._rows: np.ndarray | None = None
+        self._keys = np.empty(0)
+
+    def update(self, block: np.ndarray) -> None:
+        """Add a block of rows (rows x columns) to the stream."""
+        rows = block if self._rows is None else np.concatenate([self._rows, block])
+        keys = np.concatenate([self._keys, self._rng.random(len(block))])
+        if len(keys) > self.size:
+            # Only the `size` smallest keys matter, so partition rather than sort
+            keep = np.argpartition(keys, self.size - 1)[: self.size]
+            rows, keys = rows[keep], keys[keep]
+        self._rows, self._keys = rows, keys
+
+    @property
+    def rows(self) -> np.ndarray | None:
+        """The sampled rows, or None before the first update."""
+        return self._rows
@@ -0,0 +1,75 @@
+"""Helpers for normalizing text columns.
+
+File: utils/text.py
+
+Low-cardinality columns (categories, suppliers, payment types, store IDs)
+repeat the same handful of strings across every row. Transforming each
+distinct value once and mapping the result back by integer code avoids
+running Python-level string methods row by row.
+
+High-cardinality columns (product names) gain little from that, so they are
+converted to Arrow strings once and run through pyarrow.compute kernels,
+which work on the UTF-8 buffers in C++ without creating Python objects.
+"""
+
+from collections.abc import Callable, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+def transform_distinct(series: pd.Series, transform: Callable[[pd.Index], pd.Index]) -> pd.Series:
+    """Apply a string transform once per distinct value and return a categorical Series.
+
+    Values are stringified as by `Series.astype(str)`, so the result matches
+    `transform(series.astype(str).str)`, except that every missing value,
+    None included, becomes "nan" (`astype(str)` turns None into "None").
+
+    Args:
+        series (pd.Series): Column to normalize.
+        transform (Callable): Function taking an Index of strings and returning
+            the transformed Index, e.g. `lambda s: s.str.strip().str.lower()`.
+
+    Returns:
+        pd.Series: Categorical Series with the transformed values.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    cleaned = transform(pd.Index(uniques).astype(str))
+    categories = cleaned.unique()
+    # Distinct raw values can collapse to the same cleaned value, so re-code
+    codes = categories.get_indexer(cleaned)[codes]
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories), index=series.index, name=series.name
+    )
+
+
+def normalize_text(
+    series: pd.Series,
+    ops: Sequence[Callable[[pa.Array], pa.Array]] = (pc.utf8_trim_whitespace, pc.utf8_title),
+) -> pd.Series:
+    """Apply a chain of Arrow string kernels to a column and return an Arrow-backed Series.
+
+    The defaults match `series.astype(str).str.strip().str.title()` apart from
+    missing values and rare Unicode cases (titlecase digraphs, final sigma)
+    where Arrow and Python case mapping differ. Every missing value, None
+    included, becomes "nan" before the kernels run, whereas `astype(str)`
+    turns None into "None".
+
+    Args:
+        series (pd.Series): Column to normalize.
+        ops (Sequence[Callable]): pyarrow.compute kernels applied in order.
+
+    Returns:
+        pd.Series: Series with `pd.ArrowDtype(pa.string())` dtype.
+    """
+    try:
+        arr = pa.array(series, type=pa.string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Non-string objects: stringify them first, as astype(str) would,
+        # keeping missing values null so they also become "nan"
+        arr = pa.array(series.astype(str).where(series.notna()), type=pa.string(), from_pandas=True)
+    arr = pc.fill_null(arr, "nan")
+    for op in ops:
+        arr = op(arr)
+    return pd.Series(pd.arrays.ArrowExtensionArray(arr), index=series.index, name=series.name)
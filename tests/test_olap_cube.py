@@ -0,0 +1,89 @@
+"""Test the OLAP cube build paths.
+
+Module Information:
+    - Filename: test_olap_cube.py
+    - Module: test_olap_cube
+    - Location: tests/
+
+Every way of building the cube has to give the same cube:
+    - Aggregating in SQLite or streaming the sales table through pandas
+    - Grouping in pandas or, when asked for, in Polars
+"""
+
+import pandas as pd
+import pytest
+
+from analytics_project.olap import cubing_sales_growth as cube_module
+
+KEYS = ["product_name", "region", "sale_quarter"]
+
+
+def _build(use_polars=False):
+    """Compute the cube from the warehouse without the cache or the output files."""
+    return cube_module._build_olap_cube.__wrapped__(None, use_polars)
+
+
+def _assert_same_cube(left, right):
+    """Check the keys match exactly and the rounded measures to within a cent."""
+    pd.testing.assert_frame_equal(left[KEYS], right[KEYS])
+    # Sums taken in a different order can round a half-cent tie the other way
+    pd.testing.assert_frame_equal(left, right, check_exact=False, rtol=0, atol=0.011)
+
+
+def test_cube_keys_are_object_columns():
+    """Verify the key columns come back as plain object columns, not categoricals."""
+    cube = _build()
+
+    assert (cube[KEYS].dtypes == object).all()
+
+
+def test_sql_cube_matches_pandas_fallback(monkeypatch):
+    """Verify the SQLite-aggregated cube equals the chunked pandas fallback."""
+    sql_cube = _build()
+    assert len(sql_cube) > 0
+
+    merged_column_sql = cube_module._merged_column_sql
+
+    def missing_date_column(*args):
+        columns, joins = merged_column_sql(*args)
+        columns["sale_date"] = "s.no_such_column"
+        return columns, joins
+
+    # Break the aggregate query itself, so it fails the way a real query would
+    monkeypatch.setattr(cube_module, "_merged_column_sql", missing_date_column)
+    with pytest.raises(pd.errors.DatabaseError):
+        cube_module.ingest_warehouse_aggregated()
+
+    chunk_sizes = []
+
+    def small_chunks():
+        # Small chunks, so partial sums from many chunks are combined
+        for chunk in ingest_warehouse_chunks(chunksize=500):
+            chunk_sizes.append(len(chunk))
+            yield chunk
+
+    ingest_warehouse_chunks = cube_module.ingest_warehouse_chunks
+    monkeypatch.setattr(cube_module, "ingest_warehouse_chunks", small_chunks)
+
+    fallback_cube = _build()
+    assert len(chunk_sizes) > 1
+    _assert_same_cube(sql_cube, fallback_cube)
+
+
+def test_polars_cube_matches_pandas():
+    """Verify the opt-in Polars backend gives the pandas cube."""
+    pytest.importorskip("polars")
+
+    _assert_same_cube(_build(), _build(use_polars=True))
+
+
+def test_connectorx_reads_match_pandas(monkeypatch):
+    """Verify connectorx builds the same cube and fails like pd.read_sql_query."""
+    pytest.importorskip("connectorx")
+
+    cx_cube = _build()
+    with pytest.raises(pd.errors.DatabaseError):
+        cube_module._read_sql("SELECT no_such_column FROM sales", None)
+
+    monkeypatch.setattr(cube_module, "cx", None)
+    pd.testing.assert_frame_equal(cx_cube, _build())
@@ -0,0 +1,49 @@
+"""Test the chunked customer cleaning path.
+
+Module Information:
+    - Filename: test_prepare_customers.py
+    - Module: test_prepare_customers
+    - Location: tests/
+
+Streaming has to give the same rows as cleaning the whole file at once:
+    - Duplicates are found across chunk boundaries
+    - Medians and IQR fences match the in-memory ones below the sample size
+"""
+
+import pandas as pd
+
+from analytics_project.data_prep import prepare_customers
+from analytics_project.utils.csv_writer import write_csv
+
+
+def _raw_customers(path):
+    """Write a raw customer file with duplicates, gaps and an outlier spread over many rows."""
+    df = pd.read_csv(prepare_customers.RAW_DATA_DIR / "customers_data.csv")
+    extra = df.iloc[[0, 5, 17, 40]].copy()  # duplicates of rows in earlier chunks
+    gaps = df.iloc[[60, 61]].copy()
+    gaps.iloc[0, 4] = None  # DaysSinceLastPurchase
+    gaps.iloc[1, 0] = None  # CustomerID
+    outlier = df.iloc[[70]].copy()
+    outlier.iloc[0, 4] = 10_000
+    pd.concat([df, extra, gaps, outlier], ignore_index=True).to_csv(path, index=False)
+
+
+def test_stream_clean_matches_clean(tmp_path, monkeypatch):
+    """Verify stream_clean with tiny chunks writes the same rows as clean() on the whole file."""
+    raw = tmp_path / "customers_raw.csv"
+    _raw_customers(raw)
+
+    df = pd.read_csv(raw, engine="pyarrow")
+    df.columns = df.columns.str.strip()
+    expected_path = tmp_path / "expected.csv"
+    write_csv(prepare_customers.clean(df), expected_path)
+
+    monkeypatch.setattr(prepare_customers, "STREAM_CHUNK_ROWS", 7)
+    streamed_path = tmp_path / "streamed.csv"
+    written = prepare_customers.stream_clean(raw, streamed_path)
+
+    expected = pd.read_csv(expected_path)
+    streamed = pd.read_csv(streamed_path)
+    assert len(expected) < len(df)  # the duplicates, missing ID and outlier are dropped
+    assert written == len(expected)
+    pd.testing.assert_frame_equal(streamed, expected)
@@ -0,0 +1,65 @@
+"""Test the IQR outlier helpers.
+
+Module Information:
+    - Filename: test_utils_outliers.py
+    - Module: test_utils_outliers
+    - Location: tests/
+
+The partition-based helpers must agree with NumPy's own quantiles:
+    - IQR fences decide which customer and product rows are kept
+    - The streaming path relies on the reservoir holding every row when small
+"""
+
+import numpy as np
+
+from analytics_project.utils.outliers import ReservoirSample, iqr_mask, quartiles
+
+
+def test_quartiles_match_nanquantile():
+    """Verify quartiles() equals np.nanquantile column-wise, ignoring NaN."""
+    rng = np.random.default_rng(1)
+    values = rng.normal(size=(101, 4))
+    values[rng.random(values.shape) < 0.1] = np.nan
+    values[:2, 3] = [5.0, 5.0]
+    values[2:, 3] = np.nan  # a column with only two values
+
+    q1, q3 = quartiles(values)
+
+    expected = np.nanquantile(values, [0.25, 0.75], axis=0)
+    np.testing.assert_allclose(q1, expected[0])
+    np.testing.assert_allclose(q3, expected[1])
+
+
+def test_quartiles_all_nan_column():
+    """Verify an all-NaN column gives NaN quartiles instead of raising."""
+    values = np.array([[1.0, np.nan], [2.0, np.nan], [3.0, np.nan]])
+
+    q1, q3 = quartiles(values)
+
+    np.testing.assert_allclose(q1, [1.5, np.nan])
+    np.testing.assert_allclose(q3, [2.5, np.nan])
+
+
+def test_iqr_mask_drops_outliers_and_nan():
+    """Verify values outside the fences and NaN are masked out."""
+    values = np.array([[1.0], [2.0], [3.0], [4.0], [100.0], [np.nan]])
+    q1, q3 = quartiles(values)
+
+    mask = iqr_mask(values, q1, q3)
+
+    assert mask[:, 0].tolist() == [True, True, True, True, False, False]
+
+
+def test_reservoir_sample_keeps_all_rows_until_full():
+    """Verify the sample holds every row below its size and exactly `size` rows above it."""
+    sample = ReservoirSample(size=10)
+    assert sample.rows is None
+
+    block = np.arange(12, dtype=float).reshape(6, 2)
+    sample.update(block)
+    np.testing.assert_array_equal(np.sort(sample.rows, axis=0), block)
+
+    sample.update(block + 100)
+    assert sample.rows.shape == (10, 2)
+    seen = {tuple(row) for row in np.vstack([block, block + 100])}
+    assert {tuple(row) for row in sample.rows} <= seen